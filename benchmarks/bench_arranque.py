@@ -0,0 +1,45 @@
+"""Arranque en frío de un worker: tiempo de import y memoria hasta tener la app lista.
+
+Cada medición corre en un proceso nuevo. "app + pdf_maker" reproduce el
+import de ReportLab al cargar forms.py que se hacía antes; "solo reflex" es
+el piso que la app no puede bajar (reflex ya importa pandas por su cuenta).
+
+Ejecutar desde la raíz del proyecto (donde está rxconfig.py):
+    python -m benchmarks.bench_arranque
+"""
+import statistics
+import subprocess
+import sys
+
+REPETICIONES = 5
+CODIGO = """
+import resource, sys, time
+inicio = time.perf_counter()
+{imports}
+print(time.perf_counter() - inicio, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "reportlab" in sys.modules)
+"""
+ESCENARIOS = {
+    "solo reflex": "import reflex",
+    "app": "import reflex_alvian_app.reflex_alvian_app",
+    "app + pdf_maker": "import reflex_alvian_app.reflex_alvian_app\nimport reflex_alvian_app.utils.pdf_maker",
+}
+
+
+def _medir(imports):
+    salida = subprocess.run(
+        [sys.executable, "-c", CODIGO.format(imports=imports)], capture_output=True, text=True, check=True
+    ).stdout.split()
+    segundos, rss_kb, reportlab = salida[-3:]
+    return float(segundos), int(rss_kb) / 1024, reportlab == "True"
+
+
+def main():
+    for nombre, imports in ESCENARIOS.items():
+        mediciones = [_medir(imports) for _ in range(REPETICIONES)]
+        tiempo = statistics.median(m[0] for m in mediciones) * 1000
+        rss = statistics.median(m[1] for m in mediciones)
+        print(f"{nombre:16} import {tiempo:7.0f} ms, RSS {rss:6.1f} MB, reportlab cargado: {mediciones[0][2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Costo por evento del estado del formulario: tiempo de get_delta y tamaño del delta.
+
+Ejecutar desde la raíz del proyecto (donde está rxconfig.py):
+    python -m benchmarks.bench_estado
+
+Las evaluaciones que registra handle_submit van a una base temporal, no a
+evaluaciones.db.
+"""
+import asyncio
+import inspect
+import tempfile
+import time
+from pathlib import Path
+
+from reflex.state import State
+from reflex.utils.format import json_dumps
+
+from reflex_alvian_app.components import forms
+from reflex_alvian_app.components.forms import FormState
+from reflex_alvian_app.utils.evaluaciones import RegistroEvaluaciones
+
+REPETICIONES = 2000
+FORMULARIO = {
+    "nombre": "Juan Pérez",
+    "ci": "1234567",
+    "edad": "38",
+    "ingresos": "15000000",
+    "faja": "A",
+    "antiguedad_laboral": "3 a 5 años",
+    "posee_bienes": "Vehículo e Inmueble",
+    "monto_solicitado": "50000000",
+    "plazo": "36",
+    "tasa": "18",
+    "sistema": "Francés",
+    "comentarios": "Cliente con buen historial",
+}
+
+
+def _nuevo_estado():
+    root = State(_reflex_internal_init=True)
+    form_state = root.get_substate(FormState.get_full_name().split(".")[1:])
+    return root, form_state
+
+
+def _ejecutar(handler, form_state, *args):
+    resultado = handler.fn(form_state, *args)
+    if inspect.iscoroutine(resultado):
+        asyncio.run(resultado)
+
+
+def _medir(root, accion):
+    tiempo_delta = 0.0
+    bytes_delta = 0
+    for i in range(REPETICIONES):
+        accion(i)
+        inicio = time.perf_counter()
+        delta = root.get_delta()
+        tiempo_delta += time.perf_counter() - inicio
+        bytes_delta += len(json_dumps(delta))
+        root._clean()
+    return tiempo_delta / REPETICIONES * 1e6, bytes_delta / REPETICIONES
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directorio:
+        registro = RegistroEvaluaciones(Path(directorio) / "evaluaciones.db")
+        original, forms.registro_evaluaciones = forms.registro_evaluaciones, registro
+        try:
+            _medir_eventos()
+        finally:
+            forms.registro_evaluaciones = original
+            registro.cerrar()
+
+
+def _medir_eventos():
+    root, form_state = _nuevo_estado()
+    _ejecutar(FormState.handle_submit, form_state, FORMULARIO)
+    root._clean()
+
+    tecla_us, tecla_bytes = _medir(
+        root, lambda i: _ejecutar(FormState.change_value, form_state, f"Juan {i}", "nombre")
+    )
+    envio_us, envio_bytes = _medir(
+        root, lambda i: _ejecutar(FormState.handle_submit, form_state, {**FORMULARIO, "edad": str(20 + i % 40)})
+    )
+    estado_bytes = len(json_dumps(root.dict()))
+
+    print(f"Evento de edición: delta {tecla_us:8.1f} µs, {tecla_bytes:8.0f} bytes")
+    print(f"Envío del formulario: delta {envio_us:8.1f} µs, {envio_bytes:8.0f} bytes")
+    print(f"Estado completo serializado: {estado_bytes} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Latencia por evento con el estado en Redis a medida que se agregan réplicas.
+
+Cada réplica es un StateManagerRedis propio; todas comparten un servidor
+fakeredis en memoria, como varios backends detrás del balanceador apuntando
+al mismo Redis. Los eventos de cada sesión se reparten en round-robin entre
+réplicas, así que casi todos se atienden en una instancia distinta de la
+anterior. Sin red de por medio la cifra mide lock, lectura, deserialización
+y escritura del estado; con un Redis real hay que sumar el RTT. Todas las
+réplicas corren en este proceso, por lo que la latencia incluye la cola de
+las sesiones concurrentes: lo que muestra es que atender una sesión desde
+otra réplica no agrega costo, no el aumento de capacidad.
+
+Requiere fakeredis (pip install fakeredis). Ejecutar desde la raíz del
+proyecto (donde está rxconfig.py):
+    python -m benchmarks.bench_replicas
+"""
+import asyncio
+import statistics
+import time
+
+import fakeredis
+from reflex.state import _substate_key
+
+from reflex_alvian_app.components.forms import FormState, ResultadosState, SubidaState
+from reflex_alvian_app.utils.estado_redis import crear_state_manager, redis_local
+
+SESIONES = 32
+EVENTOS_POR_SESION = 50
+REPLICAS = (1, 2, 4, 8)
+
+
+async def _sesion(numero, replicas, latencias, subestados):
+    token = f"sesion-{numero}"
+    clave = _substate_key(token, FormState)
+    for i in range(EVENTOS_POR_SESION):
+        manager = replicas[(numero + i) % len(replicas)]
+        inicio = time.perf_counter()
+        async with manager.modify_state(clave) as root:
+            form_state = root.get_substate(FormState.get_full_name().split(".")[1:])
+            # El valor escrito por el evento anterior llegó desde otra réplica
+            if i and form_state.nombre != f"Cliente {numero} {i - 1}":
+                raise AssertionError("La sesión perdió el estado al cambiar de réplica")
+            form_state._set_value("nombre", f"Cliente {numero} {i}")
+            root.get_delta()
+            root._clean()
+            subestados.update(form_state.substates)
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def _medir(cantidad):
+    servidor = fakeredis.FakeServer()
+    replicas = [crear_state_manager(redis_local(servidor)) for _ in range(cantidad)]
+    latencias = []
+    subestados = set()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_sesion(n, replicas, latencias, subestados) for n in range(SESIONES)))
+    total = time.perf_counter() - inicio
+    claves = await replicas[0].redis.keys("sesion-0_*")
+    bytes_sesion = sum([await replicas[0].redis.strlen(c) for c in claves])
+    return latencias, total, subestados, bytes_sesion
+
+
+def main():
+    print(f"{SESIONES} sesiones x {EVENTOS_POR_SESION} eventos de edición")
+    for cantidad in REPLICAS:
+        latencias, total, subestados, bytes_sesion = asyncio.run(_medir(cantidad))
+        cuantiles = statistics.quantiles(latencias, n=100)
+        print(
+            f"{cantidad} réplica(s): p50 {cuantiles[49] * 1e3:6.2f} ms, p95 {cuantiles[94] * 1e3:6.2f} ms, "
+            f"{len(latencias) / total:7.0f} eventos/s, {bytes_sesion} bytes por sesión en Redis"
+        )
+    # Carga perezosa: un evento de FormState no lee ni escribe los substates
+    cargados = {nombre for nombre in (ResultadosState.get_name(), SubidaState.get_name()) if nombre in subestados}
+    print(f"Substates cargados en eventos de edición: {sorted(cargados) or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    main()
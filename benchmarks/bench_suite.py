@@ -0,0 +1,234 @@
+"""Suite de benchmarks: calificación, lectura de Excel del buró y dictamen PDF.
+
+Guarda los resultados en JSON junto con el commit, para comparar entre
+versiones en la misma máquina:
+    python -m benchmarks.bench_suite --salida bench/$(git rev-parse --short HEAD).json
+    python -m benchmarks.bench_suite --rapido        # sin el Excel de 100k filas
+
+Ejecutar desde la raíz del proyecto (donde está rxconfig.py). Los Excel
+sintéticos se generan una vez en --datos y se reutilizan.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from openpyxl import Workbook
+from reflex.state import State
+
+from reflex_alvian_app.components.forms import FormState, get_excel_executor
+from reflex_alvian_app.utils.calculos import (
+    cache_calificaciones,
+    calcular_calificacion_final,
+    calcular_calificacion_lote,
+)
+from reflex_alvian_app.utils.excel_deudas import cache_deudas, leer_deudas_excel
+from reflex_alvian_app.utils.pdf_maker import generate_batch_pdf, generate_batch_zip, generate_detailed_pdf
+
+FILAS_EXCEL = (1_000, 10_000, 100_000)
+FILAS_LOTE = 100_000
+PERFILES = 20_000
+DICTAMENES_LOTE = 200
+PDF = dict(
+    nombre="Juan Pérez",
+    profesion="Asalariado",
+    ingresos=15000000.0,
+    fecha_nacimiento="01/01/1986",
+    empresa="ACME S.A.",
+    perfil_comercial="Asalariado",
+    producto="Producto 1",
+    monto_solicitado=50000000.0,
+    plazo=36,
+    cuota=416000.0,
+    garantia="ASF",
+    scoring="A",
+    deuda_financiera=3360000.0,
+    ratio_deuda_ingresos=0.22,
+    puntaje=18.0,
+    dictamen="Aprobado",
+    comentarios="Cliente con buen historial",
+)
+FAJAS = list("ABCDEFGHIJKLMN")
+ANTIGUEDADES = ["6 meses a un año", "1 a 2 años", "3 a 5 años", "Más de 5 años"]
+ACTIVOS = ["No", "Vehículo", "Inmueble", "Vehículo e Inmueble"]
+
+
+def _resumen(tiempos, unidad=1e3):
+    """Mediana, p95, mínimo y máximo (por defecto en ms)."""
+    tiempos = sorted(tiempos)
+    p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+    return {
+        "n": len(tiempos),
+        "mediana": statistics.median(tiempos) * unidad,
+        "p95": p95 * unidad,
+        "min": tiempos[0] * unidad,
+        "max": tiempos[-1] * unidad,
+    }
+
+
+def _medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def _perfiles(cantidad, semilla=7):
+    azar = random.Random(semilla)
+    return [
+        (
+            azar.randint(18, 75),
+            azar.randrange(1_000_000, 40_000_000, 50_000),
+            azar.choice(FAJAS),
+            azar.choice(ANTIGUEDADES),
+            azar.choice(ACTIVOS),
+            azar.randrange(0, 20_000_000, 10_000),
+            azar.randrange(0, 3_000_000, 1_000),
+        )
+        for _ in range(cantidad)
+    ]
+
+
+def bench_calificacion(repeticiones):
+    perfiles = _perfiles(PERFILES)
+
+    def distintos():
+        cache_calificaciones.clear()
+        for perfil in perfiles:
+            calcular_calificacion_final(*perfil)
+
+    def repetidos():
+        for _ in perfiles:
+            calcular_calificacion_final(*perfiles[0])
+
+    columnas = [np.array(columna) for columna in zip(*_perfiles(FILAS_LOTE, semilla=11))]
+    return {
+        # Tiempos por llamada en microsegundos
+        "individual_us": _resumen([t / PERFILES for t in _medir(distintos, repeticiones)], 1e6),
+        "individual_cache_us": _resumen([t / PERFILES for t in _medir(repetidos, repeticiones)], 1e6),
+        f"lote_{FILAS_LOTE}_ms": _resumen(_medir(lambda: calcular_calificacion_lote(*columnas), repeticiones)),
+    }
+
+
+def crear_excel(ruta, filas, semilla=3):
+    """Reporte sintético del buró: encabezado y saldos en la columna E."""
+    azar = random.Random(semilla)
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(["Entidad", "Tipo", "Operación", "Vencimiento", "Saldo"])
+    for i in range(filas):
+        hoja.append([f"Entidad {i % 40}", "Préstamo", i, "2026-12-31", azar.randrange(0, 50_000_000, 1_000)])
+    libro.save(ruta)
+
+
+def bench_excel(directorio, filas_excel, repeticiones):
+    root = State(_reflex_internal_init=True)
+    form_state = root.get_substate(FormState.get_full_name().split(".")[1:])
+    resultados = {}
+    for filas in filas_excel:
+        ruta = Path(directorio) / f"buro_{filas}.xlsx"
+        if not ruta.exists():
+            crear_excel(ruta, filas)
+        cache_deudas.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Primera llamada fuera de la medición: arranca el pool de procesos
+            asyncio.run(form_state.load_excel_data(ruta))
+            directo = _medir(lambda: leer_deudas_excel(str(ruta)), repeticiones)
+            evento = _medir(lambda: asyncio.run(form_state.load_excel_data(ruta)), repeticiones)
+            asyncio.run(form_state.load_excel_data(ruta, "bench"))
+            cache = _medir(lambda: asyncio.run(form_state.load_excel_data(ruta, "bench")), repeticiones)
+        resultados[str(filas)] = {
+            "bytes_archivo": ruta.stat().st_size,
+            "leer_deudas_excel_ms": _resumen(directo),
+            "load_excel_data_ms": _resumen(evento),
+            "load_excel_data_cache_ms": _resumen(cache),
+        }
+    get_excel_executor().shutdown()
+    return resultados
+
+
+def bench_pdf(repeticiones):
+    generate_detailed_pdf(**PDF)
+    tiempos = _medir(lambda: generate_detailed_pdf(**PDF), repeticiones)
+    tracemalloc.start()
+    picos = []
+    for _ in range(min(repeticiones, 5)):
+        tracemalloc.reset_peak()
+        tamano = len(generate_detailed_pdf(**PDF).getvalue())
+        picos.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    lotes = {}
+    for formato, funcion in (("pdf", generate_batch_pdf), ("zip", generate_batch_zip)):
+        dictamenes = ((f"dictamen_{i}.pdf", dict(PDF, nombre=f"Solicitante {i}")) for i in range(DICTAMENES_LOTE))
+        destino = io.BytesIO()
+        inicio = time.perf_counter()
+        funcion(dictamenes, destino)
+        lotes[formato] = {"total_ms": (time.perf_counter() - inicio) * 1e3, "bytes": len(destino.getvalue())}
+    return {
+        "latencia_ms": _resumen(tiempos),
+        "memoria_pico_kb": max(picos) / 1024,
+        "bytes_pdf": tamano,
+        f"lote_{DICTAMENES_LOTE}": lotes,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--salida", default="bench_resultados.json", help="archivo JSON de resultados")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--datos", default=os.path.join(tempfile.gettempdir(), "bench_alvian"),
+                        help="directorio para los Excel sintéticos")
+    parser.add_argument("--rapido", action="store_true", help="omitir el Excel de 100k filas")
+    args = parser.parse_args(argv)
+
+    filas_excel = FILAS_EXCEL[:-1] if args.rapido else FILAS_EXCEL
+    Path(args.datos).mkdir(parents=True, exist_ok=True)
+    resultados = {
+        "commit": _commit(),
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeticiones": args.repeticiones,
+    }
+    for nombre, funcion in (
+        ("calificacion", lambda: bench_calificacion(args.repeticiones)),
+        ("excel", lambda: bench_excel(args.datos, filas_excel, args.repeticiones)),
+        ("pdf", lambda: bench_pdf(args.repeticiones)),
+    ):
+        print(f"{nombre}...", file=sys.stderr)
+        resultados[nombre] = funcion()
+    resultados["rss_max_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    Path(args.salida).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.salida).write_text(json.dumps(resultados, indent=2, ensure_ascii=False))
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
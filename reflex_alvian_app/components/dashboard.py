@@ -0,0 +1,182 @@
+import reflex as rx
+import asyncio
+from typing import List
+from ..utils.evaluaciones import DIMENSIONES_RESUMEN, registro_evaluaciones
+from ..utils.metricas import DASHBOARD_SEGUNDOS
+from ..utils.perfilado import perfilado
+from ..utils.politica import obtener_reglas
+
+# Títulos de las tablas del dashboard por dimensión del resumen
+TITULOS_DIMENSION = {"producto": "Por Producto", "garantia": "Por Garantía", "faja": "Por Faja"}
+
+
+def _orden_recomendaciones(etiquetas):
+    """Recomendaciones de la política de menor a mayor puntaje; las que ya no están en la política, al final."""
+    orden = list(dict.fromkeys(obtener_reglas().recomendacion.valores))
+    return sorted(
+        set(etiquetas), key=lambda etiqueta: (orden.index(etiqueta) if etiqueta in orden else len(orden), etiqueta)
+    )
+
+
+def _promedio(suma, cantidad, formato):
+    return format(suma / cantidad, formato) if cantidad else "-"
+
+
+def _tabla(filas, recomendaciones):
+    """Una fila por valor de la dimensión con cantidad, promedios y % por recomendación."""
+    valores = {}
+    for fila in filas:
+        valor = valores.setdefault(
+            fila["valor"],
+            {"evaluaciones": 0, "suma_puntaje": 0.0, "con_dti": 0, "suma_dti": 0.0, "por_recomendacion": {}},
+        )
+        for campo in ("evaluaciones", "suma_puntaje", "con_dti", "suma_dti"):
+            valor[campo] += fila[campo]
+        por_recomendacion = valor["por_recomendacion"]
+        por_recomendacion[fila["recomendacion"]] = por_recomendacion.get(fila["recomendacion"], 0) + fila["evaluaciones"]
+    return [
+        {
+            "valor": nombre,
+            "evaluaciones": valor["evaluaciones"],
+            "puntaje_promedio": _promedio(valor["suma_puntaje"], valor["evaluaciones"], ".1f"),
+            "dti_promedio": _promedio(valor["suma_dti"], valor["con_dti"], ".1f"),
+            "porcentajes": [
+                _promedio(100 * valor["por_recomendacion"].get(etiqueta, 0), valor["evaluaciones"], ".1f")
+                for etiqueta in recomendaciones
+            ],
+        }
+        for nombre, valor in valores.items()
+    ]
+
+
+def leer_dashboard(registro=registro_evaluaciones):
+    """Armar todos los datos del dashboard desde las tablas de resumen del registro."""
+    resumenes = {dimension: registro.resumen(dimension) for dimension in DIMENSIONES_RESUMEN}
+    # Cualquier dimensión suma todas las evaluaciones: se usa la primera para los totales
+    general = [dict(fila, valor="Total") for fila in resumenes[DIMENSIONES_RESUMEN[0]]]
+    recomendaciones = _orden_recomendaciones(fila["recomendacion"] for fila in general)
+    distribucion = {}
+    for fila in registro.distribucion_puntajes():
+        distribucion[fila["rango_puntaje"]] = distribucion.get(fila["rango_puntaje"], 0) + fila["evaluaciones"]
+    return {
+        "recomendaciones": recomendaciones,
+        "general": _tabla(general, recomendaciones),
+        "tablas": {dimension: _tabla(filas, recomendaciones) for dimension, filas in resumenes.items()},
+        "distribucion": [
+            {"puntaje": str(rango), "evaluaciones": cantidad} for rango, cantidad in sorted(distribucion.items())
+        ],
+    }
+
+
+class DashboardState(rx.State):
+    """Indicadores de la cartera, leídos de los resúmenes que se mantienen al registrar cada evaluación."""
+
+    recomendaciones: List[str] = []
+    general: List[dict] = []
+    por_producto: List[dict] = []
+    por_garantia: List[dict] = []
+    por_faja: List[dict] = []
+    distribucion: List[dict] = []
+    cargando: bool = False
+
+    @rx.event
+    @perfilado
+    async def cargar_resumen(self):
+        """Leer los resúmenes fuera del event loop y publicarlos en el estado."""
+        self.cargando = True
+        yield
+        try:
+            with DASHBOARD_SEGUNDOS.medir(operacion="cargar_resumen"):
+                datos = await asyncio.to_thread(leer_dashboard)
+        except Exception as e:
+            print(f"Error al leer el resumen de evaluaciones: {str(e)}")
+            self.cargando = False
+            return
+        self.recomendaciones = datos["recomendaciones"]
+        self.general = datos["general"]
+        self.por_producto = datos["tablas"]["producto"]
+        self.por_garantia = datos["tablas"]["garantia"]
+        self.por_faja = datos["tablas"]["faja"]
+        self.distribucion = datos["distribucion"]
+        self.cargando = False
+
+
+def tabla_resumen(titulo, filas) -> rx.Component:
+    """Tabla con cantidad, puntaje y DTI promedio y % por recomendación de cada valor."""
+    return rx.vstack(
+        rx.heading(titulo, level=3, size="5"),
+        rx.table.root(
+            rx.table.header(
+                rx.table.row(
+                    rx.table.column_header_cell(""),
+                    rx.table.column_header_cell("Evaluaciones"),
+                    rx.table.column_header_cell("Puntaje promedio"),
+                    rx.table.column_header_cell("DTI promedio (%)"),
+                    rx.foreach(
+                        DashboardState.recomendaciones,
+                        lambda etiqueta: rx.table.column_header_cell(f"% {etiqueta}"),
+                    ),
+                ),
+            ),
+            rx.table.body(
+                rx.foreach(
+                    filas,
+                    lambda fila: rx.table.row(
+                        rx.table.row_header_cell(fila["valor"].to(str)),
+                        rx.table.cell(fila["evaluaciones"].to(int)),
+                        rx.table.cell(fila["puntaje_promedio"].to(str)),
+                        rx.table.cell(fila["dti_promedio"].to(str)),
+                        rx.foreach(fila["porcentajes"].to(List[str]), lambda porcentaje: rx.table.cell(porcentaje)),
+                    ),
+                ),
+            ),
+            size="1",
+            variant="surface",
+            width="100%",
+        ),
+        width="100%",
+    )
+
+
+def dashboard() -> rx.Component:
+    return rx.box(
+        rx.vstack(
+            rx.hstack(
+                rx.heading("Dashboard de Cartera", level=2, size="7"),
+                rx.spacer(),
+                rx.button(
+                    "Actualizar",
+                    type="button",
+                    variant="soft",
+                    loading=DashboardState.cargando,
+                    on_click=DashboardState.cargar_resumen,
+                ),
+                rx.link("Volver al formulario", href="/"),
+                align="center",
+                spacing="4",
+                width="100%",
+            ),
+            tabla_resumen("General", DashboardState.general),
+            rx.heading("Distribución de Puntajes", level=3, size="5"),
+            rx.recharts.bar_chart(
+                rx.recharts.bar(data_key="evaluaciones", fill=rx.color("accent", 9)),
+                rx.recharts.x_axis(data_key="puntaje"),
+                rx.recharts.y_axis(),
+                rx.recharts.graphing_tooltip(),
+                data=DashboardState.distribucion,
+                width="100%",
+                height=250,
+            ),
+            *(
+                tabla_resumen(TITULOS_DIMENSION[dimension], filas)
+                for dimension, filas in (
+                    ("producto", DashboardState.por_producto),
+                    ("garantia", DashboardState.por_garantia),
+                    ("faja", DashboardState.por_faja),
+                )
+            ),
+            spacing="4",
+            font_size="1em",
+            padding="2em",
+        )
+    )
@@ -1,8 +1,37 @@
 import reflex as rx
-import pandas as pd
+import asyncio
+import contextlib
 import datetime
-from ..utils.pdf_maker import generate_detailed_pdf
+import functools
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ..utils.descargas import registrar_pdf, url_descarga
+from ..utils.cache_pdf import cache_pdf, clave_pdf
+from ..utils.excel_deudas import cache_deudas, leer_deudas_excel
+from ..utils.evaluaciones import registro_evaluaciones
+from ..utils.metricas import (
+    ERRORES, EXCEL_BYTES, EXCEL_SEGUNDOS, PDF_SEGUNDOS, PDFS_GENERADOS, SENSIBILIDAD_SEGUNDOS, SUBMIT_SEGUNDOS,
+    UPLOAD_SEGUNDOS,
+)
+from ..utils.perfilado import perfilado
+from ..utils.politica import obtener_reglas
+from ..utils.sensibilidad import calcular_grilla, color_puntaje, ejes_sensibilidad
+from ..utils.subidas import (
+    MAX_UPLOAD_BYTES, RUTA_SUBIDA, UploadDemasiadoGrande, guardar_bloques, nombre_seguro, parte_nombre_archivo,
+    ruta_temporal,
+)
 from typing import List
+from reflex.components.core.upload import upload_files_context_var_data
+from reflex.constants import Dirs
+from reflex.state import _substate_key
+from reflex.vars import Var, VarData
+from reflex.vars.function import FunctionStringVar
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import JSONResponse
+from ..utils.amortizacion import SISTEMAS, calcular_cuota
 from ..utils.calculos import (
     calcular_calificacion_final
 )
@@ -14,10 +43,118 @@ GARANTIA_OPTIONS = ["ASF", "Hipotecaria", "Prendaria", "Codeudoría"]
 PERFIL_COMERCIAL_OPTIONS = ['Asalariado', 'Profesional Independiente']
 BIENES_OPTIONS = ['No', 'Vehículo', 'Inmueble', 'Vehículo e Inmueble']
 PRODUCTO_OPTIONS = ["Producto 1", "Producto 2", "Producto 3"]
+SISTEMA_OPTIONS = list(SISTEMAS)
 WIDTH="50%"
 BADGE_COLOR = "primary"
 BADGE_WIDTH = "100%"
 BADGE_VARIANT = "soft"
+DEBOUNCE_MS = 500
+
+# Campos editables del formulario y su conversión de tipo
+INT_FIELDS = ("edad", "plazo")
+FLOAT_FIELDS = ("ingresos", "monto_solicitado", "tasa")
+FORM_FIELDS = (
+    "persona", "perfil_comercial", "antiguedad_laboral", "posee_bienes", "producto", "garantia",
+    "nombre", "ci", "fecha_nacimiento", "empresa", "faja", "comentarios", "sistema",
+) + INT_FIELDS + FLOAT_FIELDS
+# Campos de los que se calcula la cuota
+CUOTA_FIELDS = ("monto_solicitado", "plazo", "tasa", "sistema")
+AVISO_TASA = "Ingrese la tasa anual: sin tasa la cuota no incluye intereses"
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "2"))
+# Guardar además cada dictamen en el directorio de uploads (archivo histórico)
+ARCHIVAR_PDF = os.environ.get("ARCHIVAR_PDF", "") not in ("", "0")
+
+EXCEL_WORKERS = int(os.environ.get("EXCEL_WORKERS", "2"))
+UPLOAD_ID = "upload1"
+# AbortController de la subida en curso, guardado en los refs del navegador
+CONTROL_SUBIDA = Var("__subida_excel")._as_ref()
+
+# ReportLab se importa recién al generar el primer dictamen; con
+# PRECARGAR_DEPENDENCIAS=1 se importa en segundo plano al arrancar.
+PDF_MAKER = __name__.rsplit(".", 2)[0] + ".utils.pdf_maker"
+PRECARGAR_DEPENDENCIAS = os.environ.get("PRECARGAR_DEPENDENCIAS", "") not in ("", "0")
+PRECARGA_ESPERA = 5.0  # segundos después del arranque
+
+# Los pools se crean dentro del backend, que ya tiene otros hilos (escritor de
+# evaluaciones, hilos de asyncio): con fork un hijo puede heredar un lock tomado
+# por otro hilo y quedar bloqueado. forkserver crea los procesos desde un
+# servidor sin hilos; donde no existe (Windows) se usa spawn.
+CONTEXTO_PROCESOS = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_pdf_executor = None
+_excel_executor = None
+
+
+def get_pdf_executor():
+    """Process pool compartido para renderizar PDFs fuera del event loop."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=CONTEXTO_PROCESOS)
+    return _pdf_executor
+
+
+def get_excel_executor():
+    """Process pool compartido para procesar los Excel subidos fuera del event loop."""
+    global _excel_executor
+    if _excel_executor is None:
+        _excel_executor = ProcessPoolExecutor(max_workers=EXCEL_WORKERS, mp_context=CONTEXTO_PROCESOS)
+    return _excel_executor
+
+
+@contextlib.asynccontextmanager
+async def cerrar_pools():
+    """Tarea de vida de la app: al apagar el backend, cerrar los pools de procesos."""
+    global _pdf_executor, _excel_executor
+    try:
+        yield
+    finally:
+        pools = (_pdf_executor, _excel_executor)
+        _pdf_executor = _excel_executor = None
+        for pool in pools:
+            if pool is not None:
+                await asyncio.to_thread(pool.shutdown, cancel_futures=True)
+
+
+async def leer_deuda(file_path, file_hash=None):
+    """Deuda financiera del Excel del buró; si ya se leyó el mismo archivo, desde la cache."""
+    inicio = time.perf_counter()
+    origen = "cache"
+    try:
+        # Same workbook uploaded before: reuse the parsed result
+        tabla = cache_deudas.get(file_hash) if file_hash else None
+        if tabla is None:
+            origen = "excel"
+            # Parse in the worker pool so the event loop keeps serving other sessions
+            loop = asyncio.get_running_loop()
+            tabla = await loop.run_in_executor(
+                get_excel_executor(), leer_deudas_excel, str(file_path)
+            )
+            if file_hash:
+                cache_deudas.put(file_hash, tabla)
+            EXCEL_BYTES.inc(os.path.getsize(file_path))
+        return tabla.deuda_financiera
+    finally:
+        EXCEL_SEGUNDOS.observar(time.perf_counter() - inicio, origen)
+
+
+async def precargar_dependencias():
+    """Tarea de arranque: importar ReportLab en el backend y en el pool de PDFs.
+
+    Se espera PRECARGA_ESPERA segundos para no competir con las primeras
+    páginas; el import corre en un hilo para no bloquear el event loop.
+    """
+    if not PRECARGAR_DEPENDENCIAS:
+        return
+    await asyncio.sleep(PRECARGA_ESPERA)
+    pdf_maker = await asyncio.to_thread(importlib.import_module, PDF_MAKER)
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.run_in_executor(get_pdf_executor(), pdf_maker.precargar) for _ in range(PDF_WORKERS))
+    )
+    print("Dependencias de PDF precargadas")
+
 
 class FormState(rx.State):
     # Select fields with default values
@@ -27,6 +164,7 @@ class FormState(rx.State):
     posee_bienes: str = BIENES_OPTIONS[0]
     producto: str = PRODUCTO_OPTIONS[0]
     garantia: str = GARANTIA_OPTIONS[0]
+    sistema: str = SISTEMA_OPTIONS[0]
     
     # Text input fields
     nombre: str = ""
@@ -40,110 +178,64 @@ class FormState(rx.State):
     edad: int = 0
     ingresos: float = 0.0
     monto_solicitado: float = 0.0
-    cuota: float = 0.0
+    tasa: float = 0.0
+    tasa_ingresada: bool = False  # distingue una tasa de 0 % de una en blanco
+    cuota: float = 0.0  # calculada con el sistema de amortización
+    aviso_cuota: str = ""
     plazo: int = 0
     deuda_financiera: float = 0.0
     
     # File handling fields
     excel_filename: str = ""
-    last_generated_pdf: str = ""
-    
-    # Form data storage
-    form_data: dict = {}
 
-    # Result values
-    mostrar_resultados: bool = False
-    puntaje_final: float = 0.0
-    recomendacion: str = ""
+    # Evaluación anterior del mismo CI/RUC, para completar el formulario
+    evaluacion_previa: str = ""
+    # Se incrementa al cambiar los campos numéricos desde el backend (ver number_input)
+    formulario_version: int = 0
 
     @rx.event
-    def handle_submit(self, form_data: dict):
+    @perfilado
+    async def handle_submit(self, form_data: dict):
         """Procesar el formulario y mostrar resultados"""
-        self.form_data = {
-            "persona": getattr(self, "persona", ""),
-            "nombre": getattr(self, "nombre", ""),
-            "ci": getattr(self, "ci", ""),
-            "perfil_comercial": getattr(self, "perfil_comercial", ""),
-            "edad": getattr(self, "edad", 0),
-            "ingresos": getattr(self, "ingresos", 0.0),
-            "antiguedad_laboral": getattr(self, "antiguedad_laboral", ""),
-            "posee_bienes": getattr(self, "posee_bienes", ""),
-            "empresa": getattr(self, "empresa", ""),
-            "faja": getattr(self, "faja", ""),
-            "producto": getattr(self, "producto", ""),
-            "monto_solicitado": getattr(self, "monto_solicitado", 0.0),
-            "cuota": getattr(self, "cuota", 0.0),
-            "plazo": getattr(self, "plazo", 0),
-            "garantia": getattr(self, "garantia", ""),
-            "deuda_financiera": getattr(self, "deuda_financiera", 0.0),
-            "comentarios": getattr(self, "comentarios", ""),
-        }
-
-        # Calculate final score
-        puntaje_final, recomendacion = calcular_calificacion_final(
-            self.edad,
-            self.ingresos,
-            self.faja,
-            self.antiguedad_laboral,
-            self.posee_bienes,
-            self.deuda_financiera,
-            self.cuota
-        )
+        with SUBMIT_SEGUNDOS.medir(operacion="handle_submit"):
+            # Commit every named field of the form in one batch
+            self.change_values(form_data)
+            resultados = await self.get_state(ResultadosState)
+            if self._falta_tasa():
+                resultados.mostrar_resultados = False
+                return
 
-        # Guardar resultados en el estado
-        self.puntaje_final = puntaje_final
-        self.recomendacion = recomendacion
-        self.mostrar_resultados = True
+            # Calculate final score; the same rules object gives the version stored with it
+            reglas = obtener_reglas()
+            puntaje_final, recomendacion = calcular_calificacion_final(
+                self.edad,
+                self.ingresos,
+                self.faja,
+                self.antiguedad_laboral,
+                self.posee_bienes,
+                self.deuda_financiera,
+                self.cuota,
+                reglas=reglas,
+            )
 
-    @rx.event
-    def generate_and_download_pdf(self):
-        """Generar y descargar el PDF con los resultados"""
-        try:
-            ratio_deuda_ingresos = round(self.deuda_financiera / self.ingresos, 2) if self.ingresos > 0 else 0
+            # Guardar resultados en el estado
+            resultados.puntaje_final = puntaje_final
+            resultados.recomendacion = recomendacion
+            resultados.mostrar_resultados = True
 
-            # Generate PDF
-            pdf_buffer = generate_detailed_pdf(
+            # Guardar en el historial; la escritura se hace en lote fuera del evento
+            registro_evaluaciones.registrar(
+                ci=self.ci,
                 nombre=self.nombre,
-                profesion=self.perfil_comercial,
-                ingresos=self.ingresos,
-                fecha_nacimiento=self.fecha_nacimiento or "No especificada",
-                empresa=self.empresa,
-                perfil_comercial=self.perfil_comercial,
-                producto=self.producto,
-                monto_solicitado=self.monto_solicitado,
-                plazo=self.plazo,
-                cuota=self.cuota,
-                garantia=self.garantia,
-                scoring=self.faja,
-                deuda_financiera=self.deuda_financiera,
-                ratio_deuda_ingresos=ratio_deuda_ingresos,
-                puntaje=self.puntaje_final,
-                dictamen=self.recomendacion,
-                comentarios=self.comentarios
+                puntaje=puntaje_final,
+                recomendacion=recomendacion,
+                datos={name: getattr(self, name) for name in FORM_FIELDS + ("cuota", "deuda_financiera")},
+                version_politica=reglas.version,
             )
 
-            # Generate filename with timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"dictamen_credito_{self.nombre.replace(' ', '_')}_{timestamp}.pdf"
-
-            # Save to upload directory
-            upload_path = rx.get_upload_dir() / filename
-            upload_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(upload_path, "wb") as f:
-                f.write(pdf_buffer.getvalue())
-
-            # Store the filename for later download
-            self.last_generated_pdf = filename
-            
-            # Return download URL
-            return rx.download(url=f"/upload/{filename}")
-        except Exception as e:
-            print(f"Error generating PDF: {str(e)}")
-            return None
-
     @rx.event
-    def reset_form(self):
+    @perfilado
+    async def reset_form(self):
         """Resetear todos los valores del formulario"""
         # Reset select fields
         self.persona = PERSONA_OPTIONS[0]
@@ -152,6 +244,7 @@ class FormState(rx.State):
         self.posee_bienes = BIENES_OPTIONS[0]
         self.producto = PRODUCTO_OPTIONS[0]
         self.garantia = GARANTIA_OPTIONS[0]
+        self.sistema = SISTEMA_OPTIONS[0]
         
         # Reset text fields
         self.nombre = ""
@@ -165,66 +258,123 @@ class FormState(rx.State):
         self.edad = 0
         self.ingresos = 0.0
         self.monto_solicitado = 0.0
+        self.tasa = 0.0
+        self.tasa_ingresada = False
         self.cuota = 0.0
+        self.aviso_cuota = ""
         self.plazo = 0
         self.deuda_financiera = 0.0
         
         # Reset file fields
         self.excel_filename = ""
-        self.last_generated_pdf = ""
+        self.evaluacion_previa = ""
+        self.formulario_version += 1
+        subida = await self.get_state(SubidaState)
+        subida.upload_progress = 0
+        subida.upload_status = ""
         
         # Reset results
-        self.mostrar_resultados = False
-        self.puntaje_final = 0.0
-        self.recomendacion = ""
-        self.form_data = {}
+        resultados = await self.get_state(ResultadosState)
+        resultados.mostrar_resultados = False
+        resultados.puntaje_final = 0.0
+        resultados.recomendacion = ""
+        resultados.last_generated_pdf = ""
+        resultados.generando_pdf = False
+        resultados.progreso_pdf = ""
+        sensibilidad = await self.get_state(SensibilidadState)
+        sensibilidad.limpiar()
 
-    @rx.event
-    def change_value(self, value: str, name: str):
-        """Convert and set form values with proper types."""
+    def _set_value(self, name, value):
+        """Convert and set one form value with its proper type."""
         try:
+            ingresado = str(value if value is not None else "").strip() != ""
             # Handle type conversions based on field name
-            if name == "edad" or name == "plazo":
+            if name in INT_FIELDS:
                 value = int(value) if value else 0
-            elif name in ["ingresos", "monto_solicitado", "cuota"]:
+            elif name in FLOAT_FIELDS:
                 value = float(value) if value else 0.0
             
             # Set the converted value
             setattr(self, name, value)
+            if name == "tasa":
+                self.tasa_ingresada = ingresado
             
         except (ValueError, TypeError) as e:
             print(f"Error converting value '{value}' for field '{name}': {str(e)}")
 
     @rx.event
-    async def handle_upload(self, files: list[rx.UploadFile]):
-        """Handle file upload and process Excel data."""
+    @perfilado
+    def change_value(self, value: str, name: str):
+        """Convert and set form values with proper types."""
+        self._set_value(name, value)
+        if name in CUOTA_FIELDS:
+            self._actualizar_cuota()
+        if name == "ci":
+            self._buscar_evaluacion_previa()
+
+    def _actualizar_cuota(self):
+        """Calcular la cuota mensual desde monto, tasa, plazo y sistema; es la que usa el DTI."""
         try:
-            if not files:
-                return
-                
-            current_file = files[0]
-            upload_data = await current_file.read()
-            outfile = rx.get_upload_dir() / current_file.filename
+            self.cuota = float(round(calcular_cuota(self.monto_solicitado, self.tasa, self.plazo, self.sistema)))
+            if self.tasa_ingresada:
+                self.aviso_cuota = ""
+        except ValueError as e:
+            print(f"Error al calcular la cuota: {str(e)}")
+            self.cuota = 0.0
+            self.aviso_cuota = str(e)
 
-            with outfile.open("wb") as file_object:
-                file_object.write(upload_data)
+    def _falta_tasa(self):
+        """La tasa es obligatoria para calificar: en blanco daría una cuota sin intereses (0 % es válido)."""
+        if self.tasa_ingresada:
+            return False
+        self.aviso_cuota = AVISO_TASA
+        return True
 
-            self.excel_filename = current_file.filename
-            self.load_excel_data(outfile)
-            
+    def _buscar_evaluacion_previa(self):
+        """Avisar si el CI/RUC ya tiene una evaluación guardada."""
+        try:
+            evaluacion = registro_evaluaciones.ultima_evaluacion(self.ci)
         except Exception as e:
-            print(f"Error handling file upload: {str(e)}")
-            self.excel_filename = ""
-            self.deuda_financiera = 0.0
+            print(f"Error al buscar evaluaciones anteriores: {str(e)}")
+            evaluacion = None
+        if evaluacion is None:
+            self.evaluacion_previa = ""
+            return
+        self.evaluacion_previa = (
+            f"Evaluado el {evaluacion['fecha'][:10]}: puntaje {evaluacion['puntaje']}, "
+            f"{evaluacion['recomendacion']}"
+        )
 
-    def load_excel_data(self, file_path):
+    @rx.event
+    @perfilado
+    def cargar_evaluacion_previa(self):
+        """Completar el formulario con los datos de la última evaluación del CI/RUC."""
+        evaluacion = registro_evaluaciones.ultima_evaluacion(self.ci)
+        if evaluacion is None:
+            return
+        # La deuda no se copia: debe salir del reporte del buró vigente
+        self.change_values({name: value for name, value in evaluacion["datos"].items() if name != "ci"})
+        self.evaluacion_previa = ""
+        self.formulario_version += 1
+
+    @rx.event
+    @perfilado
+    def change_values(self, values: dict):
+        """Set several form fields in a single event, with the same conversion as change_value."""
+        for name, value in values.items():
+            if name in FORM_FIELDS:
+                self._set_value(name, value)
+        if any(name in values for name in CUOTA_FIELDS):
+            self._actualizar_cuota()
+
+    async def load_excel_data(self, file_path, file_hash=None):
         """Load and process Excel data."""
         try:
-            data_frame = pd.read_excel(file_path)
-            self.deuda_financiera = float(data_frame.iloc[1:, 4].sum())
+            self.deuda_financiera = await leer_deuda(file_path, file_hash)
             print(f"Deuda Financiera actualizada: {self.deuda_financiera:,.2f}")
         except Exception as e:
             print(f"Error al procesar el archivo Excel: {str(e)}")
+            ERRORES.inc(1, "load_excel_data")
             self.deuda_financiera = 0.0
 
     def get_str_value(self, value, default=""):
@@ -234,6 +384,370 @@ class FormState(rx.State):
         except:
             return default
 
+class SubidaState(rx.State):
+    """Progreso de la carga del Excel.
+
+    Lo actualiza la ruta RUTA_SUBIDA mientras recibe el archivo; en un state
+    aparte cada actualización persiste solo estos dos campos y no todo el
+    formulario.
+    """
+
+    upload_progress: int = 0
+    upload_status: str = ""
+
+    @rx.event
+    def cancel_upload(self):
+        """Cancelar la carga en curso."""
+        self.upload_progress = 0
+        self.upload_status = "Carga cancelada"
+        return rx.run_script(f"{CONTROL_SUBIDA}?.abort()")
+
+
+def ruta_subida_excel(app):
+    """Endpoint POST de RUTA_SUBIDA: recibe el Excel como cuerpo y lo guarda en disco por bloques.
+
+    El upload propio de Reflex copia el archivo entero a memoria antes de
+    llamar al handler, así que el límite llegaba tarde. Acá MAX_UPLOAD_BYTES
+    se controla con Content-Length antes de leer el cuerpo y otra vez
+    mientras se lee. El progreso y la deuda calculada se publican en el
+    estado de la sesión (token) con app.modify_state. El archivo se guarda
+    con un nombre único, se lee desde ahí y se borra al terminar.
+    """
+
+    async def subir_excel(request: Request, token: str, nombre: str):
+        async def publicar(status, progreso=0, **campos):
+            async with app.modify_state(_substate_key(token, SubidaState)) as estado:
+                subida = await estado.get_state(SubidaState)
+                subida.upload_status = status
+                subida.upload_progress = progreso
+                if campos:
+                    form = await estado.get_state(FormState)
+                    for campo, valor in campos.items():
+                        setattr(form, campo, valor)
+
+        with UPLOAD_SEGUNDOS.medir():
+            try:
+                filename = nombre_seguro(nombre)
+                declarado = int(request.headers.get("content-length") or 0)
+                if declarado > MAX_UPLOAD_BYTES:
+                    raise UploadDemasiadoGrande(
+                        f"El archivo supera el límite de {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"
+                    )
+                await publicar("Subiendo archivo...")
+                informado = 0
+
+                async def progreso(escritos):
+                    nonlocal informado
+                    porcentaje = min(escritos * 100 // declarado, 100) if declarado else 0
+                    # Una actualización del estado cada 10 %, no una por bloque
+                    if porcentaje >= informado + 10:
+                        informado = porcentaje
+                        await publicar("Subiendo archivo...", porcentaje)
+
+                outfile = ruta_temporal(rx.get_upload_dir(), filename)
+                try:
+                    file_hash = await guardar_bloques(
+                        request.stream(), outfile, max_bytes=MAX_UPLOAD_BYTES, progreso=progreso
+                    )
+                    await publicar("Procesando archivo...", 100)
+                    deuda = await leer_deuda(outfile, file_hash)
+                finally:
+                    outfile.unlink(missing_ok=True)
+                print(f"Deuda Financiera actualizada: {deuda:,.2f}")
+                await publicar("", excel_filename=filename, deuda_financiera=deuda)
+                return {"archivo": filename, "deuda_financiera": deuda}
+            except UploadDemasiadoGrande as e:
+                print(f"Error handling file upload: {str(e)}")
+                ERRORES.inc(1, "subir_excel")
+                await publicar(str(e), excel_filename="", deuda_financiera=0.0)
+                return JSONResponse({"error": str(e)}, status_code=413)
+            except ClientDisconnect:
+                # Cancelada desde el navegador: cancel_upload ya informó el estado
+                return JSONResponse({"error": "Carga cancelada"}, status_code=499)
+            except Exception as e:
+                print(f"Error handling file upload: {str(e)}")
+                ERRORES.inc(1, "subir_excel")
+                await publicar("Error al procesar el archivo", excel_filename="", deuda_financiera=0.0)
+                return JSONResponse({"error": "Error al procesar el archivo"}, status_code=400)
+
+    return subir_excel
+
+
+def subir_excel_js():
+    """Función del navegador que envía el archivo elegido en UPLOAD_ID a RUTA_SUBIDA.
+
+    No devuelve la promesa del fetch, para no frenar la cola de eventos
+    mientras dura la subida; el resultado llega por el estado.
+    """
+    url = rx.config.get_config().api_url.rstrip("/") + RUTA_SUBIDA
+    codigo = f"""() => {{
+    const archivo = (filesById["{UPLOAD_ID}"] || [])[0];
+    if (!archivo) return;
+    {CONTROL_SUBIDA} = new AbortController();
+    const parametros = new URLSearchParams({{token: getToken(), nombre: archivo.name}});
+    fetch("{url}?" + parametros, {{
+        method: "POST",
+        body: archivo,
+        headers: {{"Content-Type": "application/octet-stream"}},
+        signal: {CONTROL_SUBIDA}.signal,
+    }}).catch(() => null);
+}}"""
+    return FunctionStringVar.create(
+        codigo,
+        _var_data=VarData.merge(
+            upload_files_context_var_data,
+            CONTROL_SUBIDA._get_all_var_data(),
+            VarData(imports={f"$/{Dirs.STATE_PATH}": ["getToken"]}),
+        ),
+    )
+
+
+class ResultadosState(rx.State):
+    """Resultados de la evaluación, separados de los campos del formulario.
+
+    Es hermano de FormState y no hijo: los eventos de edición no cargan,
+    comparan ni vuelven a guardar estos valores (con Redis se leen solo
+    cuando un evento los pide con get_state).
+    """
+
+    # Result values
+    mostrar_resultados: bool = False
+    puntaje_final: float = 0.0
+    recomendacion: str = ""
+
+    # PDF generation
+    last_generated_pdf: str = ""
+    generando_pdf: bool = False
+    progreso_pdf: str = ""
+
+    @rx.event(background=True)
+    @perfilado
+    async def generate_and_download_pdf(self):
+        """Generar y descargar el PDF con los resultados"""
+        inicio = time.perf_counter()
+        async with self:
+            if self.generando_pdf:
+                return
+            self.generando_pdf = True
+            self.progreso_pdf = "Generando dictamen..."
+            form = await self.get_state(FormState)
+            ratio_deuda_ingresos = round(form.deuda_financiera / form.ingresos, 2) if form.ingresos > 0 else 0
+            pdf_kwargs = dict(
+                nombre=form.nombre,
+                profesion=form.perfil_comercial,
+                ingresos=form.ingresos,
+                fecha_nacimiento=form.fecha_nacimiento or "No especificada",
+                empresa=form.empresa,
+                perfil_comercial=form.perfil_comercial,
+                producto=form.producto,
+                monto_solicitado=form.monto_solicitado,
+                plazo=form.plazo,
+                cuota=form.cuota,
+                garantia=form.garantia,
+                scoring=form.faja,
+                deuda_financiera=form.deuda_financiera,
+                ratio_deuda_ingresos=ratio_deuda_ingresos,
+                puntaje=self.puntaje_final,
+                dictamen=self.recomendacion,
+                comentarios=form.comentarios
+            )
+
+        try:
+            # Reuse a previous render of the same inputs when available
+            pdf_key = clave_pdf(pdf_kwargs)
+            pdf_bytes = await asyncio.to_thread(cache_pdf.get, pdf_key)
+            origen = "cache"
+            if pdf_bytes is None:
+                origen = "render"
+                # ReportLab loads on first use, in a thread so the event loop is not blocked
+                pdf_maker = await asyncio.to_thread(importlib.import_module, PDF_MAKER)
+                # Render PDF in the process pool so the event loop keeps serving other events
+                loop = asyncio.get_running_loop()
+                pdf_bytes = await loop.run_in_executor(
+                    get_pdf_executor(), functools.partial(pdf_maker.generate_detailed_pdf_bytes, **pdf_kwargs)
+                )
+                await asyncio.to_thread(cache_pdf.put, pdf_key, pdf_bytes)
+
+            # Generate filename with timestamp
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"dictamen_credito_{parte_nombre_archivo(pdf_kwargs['nombre'])}_{timestamp}.pdf"
+
+            # Optional archival copy in the upload directory
+            if ARCHIVAR_PDF:
+                upload_path = rx.get_upload_dir() / filename
+                upload_path.parent.mkdir(parents=True, exist_ok=True)
+                await asyncio.to_thread(upload_path.write_bytes, pdf_bytes)
+
+            token = await registrar_pdf(filename, pdf_bytes)
+
+            async with self:
+                # Store the filename for later download
+                self.last_generated_pdf = filename
+                self.generando_pdf = False
+                self.progreso_pdf = ""
+
+            PDFS_GENERADOS.inc(1, origen)
+            PDF_SEGUNDOS.observar(time.perf_counter() - inicio, origen)
+            # Stream the PDF from memory through the backend API route
+            return rx.download(url=rx.Var.create(url_descarga(token)), filename=filename)
+        except Exception as e:
+            print(f"Error generating PDF: {str(e)}")
+            ERRORES.inc(1, "generate_and_download_pdf")
+            async with self:
+                self.generando_pdf = False
+                self.progreso_pdf = ""
+            return None
+
+
+class SensibilidadState(rx.State):
+    """Grilla what-if de monto x plazo para el solicitante del formulario.
+
+    Todas las combinaciones se califican en una sola llamada en lote, sin
+    volver a enviar el formulario por cada una.
+    """
+
+    mostrar_grilla: bool = False
+    plazos: List[int] = []
+    # Una fila por monto: monto y una celda por plazo con cuota, puntaje, recomendación y color
+    filas: List[dict] = []
+
+    def limpiar(self):
+        self.mostrar_grilla = False
+        self.plazos = []
+        self.filas = []
+
+    @rx.event
+    @perfilado
+    async def calcular_sensibilidad(self):
+        """Calificar la grilla alrededor del monto y plazo solicitados."""
+        with SENSIBILIDAD_SEGUNDOS.medir(operacion="calcular_sensibilidad"):
+            form = await self.get_state(FormState)
+            if form._falta_tasa():
+                self.limpiar()
+                return
+            montos, plazos = ejes_sensibilidad(form.monto_solicitado, form.plazo)
+            try:
+                grilla = calcular_grilla(
+                    form.edad, form.ingresos, form.faja, form.antiguedad_laboral, form.posee_bienes,
+                    form.deuda_financiera, montos, plazos, form.tasa, form.sistema,
+                )
+            except ValueError as e:
+                print(f"Error al calcular la grilla de sensibilidad: {str(e)}")
+                self.limpiar()
+                return
+            colores = color_puntaje(grilla.puntaje)
+            self.plazos = [int(plazo) for plazo in grilla.plazos]
+            self.filas = [
+                {
+                    "monto": float(monto),
+                    "celdas": [
+                        {
+                            "monto": float(monto),
+                            "plazo": int(plazo),
+                            "cuota": float(grilla.cuota[i, j]),
+                            "puntaje": float(grilla.puntaje[i, j]),
+                            "recomendacion": str(grilla.recomendacion[i, j]),
+                            "color": str(colores[i, j]),
+                            "actual": bool(monto == form.monto_solicitado and plazo == form.plazo),
+                        }
+                        for j, plazo in enumerate(grilla.plazos)
+                    ],
+                }
+                for i, monto in enumerate(grilla.montos)
+            ]
+            self.mostrar_grilla = True
+
+    @rx.event
+    @perfilado
+    async def aplicar_celda(self, monto: float, plazo: int):
+        """Pasar al formulario el monto y plazo de una celda de la grilla y recalificar con ellos."""
+        form = await self.get_state(FormState)
+        form.change_values({"monto_solicitado": monto, "plazo": plazo})
+        form.formulario_version += 1
+        # El resultado mostrado y el del dictamen tienen que corresponder al monto y plazo nuevos
+        resultados = await self.get_state(ResultadosState)
+        resultados.puntaje_final, resultados.recomendacion = calcular_calificacion_final(
+            form.edad, form.ingresos, form.faja, form.antiguedad_laboral, form.posee_bienes,
+            form.deuda_financiera, form.cuota,
+        )
+        resultados.last_generated_pdf = ""
+        await self.calcular_sensibilidad()
+
+
+def celda_sensibilidad(celda) -> rx.Component:
+    """Celda de la grilla; al hacer clic se usa su monto y plazo en el formulario."""
+    return rx.table.cell(
+        rx.vstack(
+            rx.text(celda["puntaje"].to(float), weight="bold", size="2"),
+            rx.text(celda["recomendacion"].to(str), size="1"),
+            rx.text(f"Gs. {celda['cuota'].to(float):,.0f}", size="1"),
+            spacing="0",
+        ),
+        background=celda["color"].to(str),
+        border=rx.cond(celda["actual"].to(bool), "2px solid black", "none"),
+        cursor="pointer",
+        on_click=SensibilidadState.aplicar_celda(celda["monto"].to(float), celda["plazo"].to(int)),
+    )
+
+
+def grilla_sensibilidad() -> rx.Component:
+    """Tabla de calor: montos en filas, plazos en columnas."""
+    return rx.table.root(
+        rx.table.header(
+            rx.table.row(
+                rx.table.column_header_cell("Monto / Plazo"),
+                rx.foreach(SensibilidadState.plazos, lambda plazo: rx.table.column_header_cell(f"{plazo} m")),
+            ),
+        ),
+        rx.table.body(
+            rx.foreach(
+                SensibilidadState.filas,
+                lambda fila: rx.table.row(
+                    rx.table.row_header_cell(f"Gs. {fila['monto'].to(float):,.0f}"),
+                    rx.foreach(fila["celdas"].to(List[dict]), celda_sensibilidad),
+                ),
+            ),
+        ),
+        size="1",
+        variant="surface",
+    )
+
+
+def text_input(FormState, name, placeholder) -> rx.Component:
+    """Input controlado que envía su valor tras DEBOUNCE_MS sin teclear o al salir del campo."""
+    return rx.debounce_input(
+        rx.input(
+            placeholder=placeholder,
+            name=name,
+            on_change=lambda value: FormState.change_value(value, name),
+            width=WIDTH,
+        ),
+        value=getattr(FormState, name),
+        debounce_timeout=DEBOUNCE_MS,
+        force_notify_on_blur=True,
+    )
+
+
+def number_input(FormState, name, placeholder, ingresado=None) -> rx.Component:
+    """Input numérico que envía su valor solo al salir del campo.
+
+    No es controlado: el valor del estado se usa como valor inicial y el
+    input se vuelve a montar cuando cambia formulario_version. Un 0 se
+    muestra en blanco, salvo que ingresado indique que se cargó a propósito.
+    """
+    value = getattr(FormState, name)
+    vacio = value == 0 if ingresado is None else ~ingresado
+    return rx.input(
+        placeholder=placeholder,
+        name=name,
+        default_value=rx.cond(vacio, "", value.to_string()),
+        key=f"{name}-{FormState.formulario_version}",
+        on_blur=lambda value: FormState.change_value(value, name),
+        type="number",
+        width=WIDTH,
+    )
+
+
 def main_form(FormState) -> rx.Component:
     return rx.vstack(
         rx.form(
@@ -244,53 +758,51 @@ def main_form(FormState) -> rx.Component:
                     rx.select(
                         PERSONA_OPTIONS,
                         value=FormState.persona | PERSONA_OPTIONS[0],
+                        name="persona",
                         on_change=lambda value: FormState.change_value(value, "persona"),
                         width=WIDTH,
                     ),
                     rx.select(
                         PERFIL_COMERCIAL_OPTIONS,
                         value=FormState.perfil_comercial | PERFIL_COMERCIAL_OPTIONS[0],
+                        name="perfil_comercial",
                         on_change=lambda value: FormState.change_value(value, "perfil_comercial"),
                         width=WIDTH,
                     ),
                     width="100%",
                 ),
                 rx.hstack(
-                    rx.input(
-                        placeholder="Nombre y Apellido",
-                        value=FormState.nombre,
-                        on_change=lambda value: FormState.change_value(value, "nombre"),
-                        width=WIDTH,
-                    ),
-                    rx.input(
-                        placeholder="Cédula de Identidad/RUC",
-                        value=FormState.ci,
-                        on_change=lambda value: FormState.change_value(value, "ci"),
-                        width=WIDTH,
-                    ),
+                    text_input(FormState, "nombre", "Nombre y Apellido"),
+                    text_input(FormState, "ci", "Cédula de Identidad/RUC"),
                     width="100%",
                 ),
-                rx.hstack(
-                    rx.input(
-                        placeholder="Edad",
-                        on_change=lambda value: FormState.change_value(value, "edad"),
-                        type="number",
-                        width=WIDTH,
+                rx.cond(
+                    FormState.evaluacion_previa != "",
+                    rx.hstack(
+                        rx.text(FormState.evaluacion_previa, size="2"),
+                        rx.button(
+                            "Completar con la evaluación anterior",
+                            type="button",
+                            variant="soft",
+                            size="1",
+                            on_click=FormState.cargar_evaluacion_previa,
+                        ),
+                        align="center",
+                        width="100%",
                     ),
+                ),
+                rx.hstack(
+                    number_input(FormState, "edad", "Edad"),
                     width="100%",
                 ),
                 rx.divider(),
                 rx.heading("Datos de Evaluación", level=3, size="5"),
                 rx.hstack(
-                    rx.input(
-                        placeholder="Ingresos",
-                        on_change=lambda value: FormState.change_value(value, "ingresos"),
-                        type="number",
-                        width=WIDTH,
-                    ),
+                    number_input(FormState, "ingresos", "Ingresos"),
                     rx.select(
                         ANTIGUEDAD_OPTIONS,
                         value=FormState.antiguedad_laboral | ANTIGUEDAD_OPTIONS[0],
+                        name="antiguedad_laboral",
                         on_change=lambda value: FormState.change_value(value, "antiguedad_laboral"),
                         width=WIDTH,
                     ),
@@ -300,24 +812,15 @@ def main_form(FormState) -> rx.Component:
                     rx.select(
                         BIENES_OPTIONS,
                         value=FormState.posee_bienes | BIENES_OPTIONS[0],
+                        name="posee_bienes",
                         on_change=lambda value: FormState.change_value(value, "posee_bienes"),
                         width=WIDTH,
                     ),
-                    rx.input(
-                        placeholder="Empresa",
-                        value=FormState.empresa,
-                        on_change=lambda value: FormState.change_value(value, "empresa"),
-                        width=WIDTH,
-                    ),
+                    text_input(FormState, "empresa", "Empresa"),
                     width="100%",
                 ),
                 rx.hstack(
-                    rx.input(
-                        placeholder="Faja Scoring Informconf",
-                        value=FormState.faja,
-                        on_change=lambda value: FormState.change_value(value, "faja"),
-                        width=WIDTH,
-                    ),
+                    text_input(FormState, "faja", "Faja Scoring Informconf"),
                     width="100%",
                 ),
                 rx.divider(),
@@ -326,36 +829,39 @@ def main_form(FormState) -> rx.Component:
                     rx.select(
                         PRODUCTO_OPTIONS,
                         value=FormState.producto | PRODUCTO_OPTIONS[0],
+                        name="producto",
                         on_change=lambda value: FormState.change_value(value, "producto"),
                         width=WIDTH,
                     ),
-                    rx.input(
-                        placeholder="Monto Solicitado",
-                        on_change=lambda value: FormState.change_value(value, "monto_solicitado"),
-                        type="number",
-                        width=WIDTH,
-                    ),
+                    number_input(FormState, "monto_solicitado", "Monto Solicitado"),
                         width="100%",
                 ),
                 rx.hstack(
-                    rx.input(
-                        placeholder="Monto Cuota",
-                        on_change=lambda value: FormState.change_value(value, "cuota"),
-                        type="number",
-                        width=WIDTH,
-                    ),
-                    rx.input(
-                        placeholder="Plazo (meses)",
-                        on_change=lambda value: FormState.change_value(value, "plazo"),
-                        type="number",
+                    number_input(FormState, "plazo", "Plazo (meses)"),
+                    number_input(FormState, "tasa", "Tasa anual (%)", FormState.tasa_ingresada),
+                    width="100%",
+                ),
+                rx.hstack(
+                    rx.select(
+                        SISTEMA_OPTIONS,
+                        value=FormState.sistema | SISTEMA_OPTIONS[0],
+                        name="sistema",
+                        on_change=lambda value: FormState.change_value(value, "sistema"),
                         width=WIDTH,
                     ),
+                    rx.text(f"Cuota calculada: Gs. {FormState.cuota:,.0f}", width=WIDTH),
+                    align="center",
                     width="100%",
                 ),
+                rx.cond(
+                    FormState.aviso_cuota != "",
+                    rx.text(FormState.aviso_cuota, color_scheme="red", size="2"),
+                ),
                 rx.hstack(
                     rx.select(
                         GARANTIA_OPTIONS,
                         value=FormState.garantia | GARANTIA_OPTIONS[0],
+                        name="garantia",
                         on_change=lambda value: FormState.change_value(value, "garantia"),
                         width=WIDTH,
                     ),
@@ -372,16 +878,23 @@ def main_form(FormState) -> rx.Component:
                             ),
                             rx.text("Arrastre el archivo aquí o haga clic para seleccionar", size="2"),
                         ),
-                        id="upload1",
+                        id=UPLOAD_ID,
                         max_files=1,
+                        max_size=MAX_UPLOAD_BYTES,
                         padding="0.5em",
                     ),
-                    rx.text(rx.selected_files("upload1"), size="1"),
+                    rx.text(rx.selected_files(UPLOAD_ID), size="1"),
                     rx.hstack(
                         rx.button(
                             "Calcular Deuda",
                             type="button",
-                            on_click=lambda: FormState.handle_upload(rx.upload_files("upload1")),
+                            on_click=rx.call_function(subir_excel_js()),
+                        ),
+                        rx.button(
+                            "Cancelar",
+                            type="button",
+                            variant="soft",
+                            on_click=SubidaState.cancel_upload,
                         ),
                         #rx.button(
                         #    "Limpiar",
@@ -391,6 +904,14 @@ def main_form(FormState) -> rx.Component:
                         spacing="2",
                         padding="0.2em",
                     ),
+                    rx.cond(
+                        SubidaState.upload_status != "",
+                        rx.vstack(
+                            rx.progress(value=SubidaState.upload_progress, max=100),
+                            rx.text(SubidaState.upload_status, size="1"),
+                            width="100%",
+                        ),
+                    ),
                 ),
                 rx.cond(
                     FormState.excel_filename != "",
@@ -401,20 +922,15 @@ def main_form(FormState) -> rx.Component:
                     ),
                 ),                
                 rx.divider(),
-                rx.input(
-                    placeholder="Comentarios",
-                    value=FormState.comentarios,
-                    on_change=lambda value: FormState.change_value(value, "comentarios"),
-                    width=WIDTH,
-                ),
+                text_input(FormState, "comentarios", "Comentarios"),
                 rx.cond(
-                    FormState.mostrar_resultados,
+                    ResultadosState.mostrar_resultados,
                     rx.vstack(
                         rx.heading("Resultados de la Evaluación", size="5", align="center"),
                         rx.box(
                             rx.vstack(
-                                rx.text(f"Puntaje Final: {FormState.puntaje_final}", size="4"),
-                                rx.text(f"Recomendación: {FormState.recomendacion}", size="4"),
+                                rx.text(f"Puntaje Final: {ResultadosState.puntaje_final}", size="4"),
+                                rx.text(f"Recomendación: {ResultadosState.recomendacion}", size="4"),
                                 spacing="4",
                                 padding="2em",
                                 border="1px solid",
@@ -429,7 +945,8 @@ def main_form(FormState) -> rx.Component:
                                 bg="green.500",
                                 color="white",
                                 _hover={"bg": "green.600"},
-                                on_click=FormState.generate_and_download_pdf,
+                                loading=ResultadosState.generando_pdf,
+                                on_click=ResultadosState.generate_and_download_pdf,
                             ),
                             rx.button(
                                 "Nueva Solicitud",
@@ -439,9 +956,31 @@ def main_form(FormState) -> rx.Component:
                                 _hover={"bg": "blue.600"},
                                 on_click=FormState.reset_form,
                             ),
+                            rx.button(
+                                "Sensibilidad Monto x Plazo",
+                                type="button",
+                                variant="soft",
+                                on_click=SensibilidadState.calcular_sensibilidad,
+                            ),
                             spacing="4",
                             padding="1em",
                         ),
+                        rx.cond(
+                            SensibilidadState.mostrar_grilla,
+                            rx.vstack(
+                                rx.text("Clic en una celda para usar ese monto y plazo", size="1"),
+                                rx.scroll_area(grilla_sensibilidad(), type="auto", width="100%"),
+                                width="100%",
+                            ),
+                        ),
+                        rx.cond(
+                            ResultadosState.generando_pdf,
+                            rx.hstack(
+                                rx.spinner(),
+                                rx.text(ResultadosState.progreso_pdf, size="2"),
+                                spacing="2",
+                            ),
+                        ),
                     ),
                     rx.button(
                         "Procesar Solicitud",
@@ -0,0 +1,439 @@
+"""Evaluación masiva de solicitantes desde archivos CSV, Excel o Parquet.
+
+Lee el archivo de entrada por bloques, califica cada bloque con
+calcular_calificacion_dataframe y escribe el resultado a medida que avanza,
+de modo que el uso de memoria depende del tamaño de bloque y no del archivo.
+Si el archivo no trae la columna cuota, se calcula con monto_solicitado,
+plazo, tasa y sistema (francés por defecto).
+Con --procesos y --pdf la calificación y la generación de dictámenes PDF se
+reparten en tareas entre varios procesos. Con --pdf-lote los dictámenes
+se juntan en un solo PDF o en un ZIP, escritos a medida que avanza.
+
+Uso:
+    python -m reflex_alvian_app.evaluacion_masiva entrada.csv salida.csv
+    python -m reflex_alvian_app.evaluacion_masiva lote.xlsx salida.parquet --bloque 20000
+    python -m reflex_alvian_app.evaluacion_masiva lote.csv salida.csv --pdf dictamenes/ --procesos 32
+    python -m reflex_alvian_app.evaluacion_masiva lote.csv salida.csv --pdf-lote comite.pdf
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .utils.amortizacion import FRANCES, calcular_cuota, sistema_valido
+from .utils.calculos import COLUMNAS_LOTE, calcular_calificacion_dataframe
+from .utils.subidas import parte_nombre_archivo
+
+TAMANO_BLOQUE = 50_000
+TAMANO_TAREA = 200  # filas por tarea enviada a cada proceso
+SIN_DATOS = "Datos incompletos"
+COLUMNAS_CUOTA = ("monto_solicitado", "plazo", "tasa")
+# Columnas numéricas conocidas: en el Parquet van siempre como float64, aunque
+# el primer bloque las traiga vacías o con enteros
+COLUMNAS_NUMERICAS = ("edad", "ingresos", "deudas", "monto_solicitado", "plazo", "tasa", "cuota", "puntaje_total")
+
+
+def _formato(ruta):
+    sufijo = Path(ruta).suffix.lower()
+    if sufijo in (".csv", ".txt"):
+        return "csv"
+    if sufijo in (".xlsx", ".xlsm"):
+        return "excel"
+    if sufijo in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Formato de archivo no soportado: {ruta}")
+
+
+def leer_bloques(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """Generar DataFrames de hasta tamano_bloque filas sin cargar el archivo completo."""
+    formato = _formato(ruta)
+    if formato == "csv":
+        yield from pd.read_csv(ruta, chunksize=tamano_bloque)
+    elif formato == "parquet":
+        import pyarrow.parquet as pq
+
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque):
+            yield lote.to_pandas()
+    else:
+        from openpyxl import load_workbook
+
+        libro = load_workbook(ruta, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezado = [str(celda) if celda is not None else "" for celda in next(filas, ())]
+            bloque = []
+            for fila in filas:
+                bloque.append(fila[:len(encabezado)])
+                if len(bloque) >= tamano_bloque:
+                    yield pd.DataFrame(bloque, columns=encabezado)
+                    bloque = []
+            if bloque:
+                yield pd.DataFrame(bloque, columns=encabezado)
+        finally:
+            libro.close()
+
+
+def _numericas_float(data_frame):
+    """Pasar a float64 las columnas de COLUMNAS_NUMERICAS que vengan con otro tipo."""
+    columnas = {
+        columna: data_frame[columna].astype("float64")
+        for columna in COLUMNAS_NUMERICAS
+        if columna in data_frame.columns and data_frame[columna].dtype != "float64"
+    }
+    return data_frame.assign(**columnas) if columnas else data_frame
+
+
+def _como_texto(data_frame, esquema):
+    """Convertir a texto los valores de las columnas que el esquema del Parquet guarda como texto."""
+    import pyarrow as pa
+
+    columnas = [
+        campo.name for campo in esquema
+        if pa.types.is_string(campo.type) and campo.name in data_frame.columns
+        and data_frame[campo.name].dtype != object
+    ]
+    if not columnas:
+        return data_frame
+    return data_frame.assign(**{
+        columna: data_frame[columna].map(lambda valor: None if pd.isna(valor) else str(valor))
+        for columna in columnas
+    })
+
+
+class EscritorBloques:
+    """Escribir bloques calificados de forma incremental en CSV, Excel o Parquet."""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.formato = _formato(ruta)
+        self._parquet = None
+        self._libro = None
+        self._hoja = None
+        self._primero = True
+
+    def escribir(self, data_frame):
+        if self.formato == "csv":
+            data_frame.to_csv(self.ruta, mode="w" if self._primero else "a", header=self._primero, index=False)
+        elif self.formato == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            data_frame = _numericas_float(data_frame)
+            if self._parquet is None:
+                tabla = pa.Table.from_pandas(data_frame, preserve_index=False)
+                # Columnas sin tipo conocido y sin ningún valor en el primer bloque (por
+                # ejemplo comentarios opcionales; leídas de un CSV llegan como NaN): se
+                # guardan como texto, que admite lo que traigan los bloques siguientes
+                vacias = set(data_frame.columns[data_frame.isna().all().to_numpy()]) - set(COLUMNAS_NUMERICAS)
+                esquema = tabla.schema
+                for indice, campo in enumerate(esquema):
+                    if pa.types.is_null(campo.type) or campo.name in vacias:
+                        esquema = esquema.set(indice, pa.field(campo.name, pa.string()))
+                tabla = tabla.cast(esquema)
+                self._parquet = pq.ParquetWriter(self.ruta, tabla.schema)
+            else:
+                tabla = pa.Table.from_pandas(
+                    _como_texto(data_frame, self._parquet.schema), schema=self._parquet.schema, preserve_index=False
+                )
+            self._parquet.write_table(tabla)
+        else:
+            if self._libro is None:
+                from openpyxl import Workbook
+
+                self._libro = Workbook(write_only=True)
+                self._hoja = self._libro.create_sheet()
+                self._hoja.append(list(data_frame.columns))
+            for fila in data_frame.itertuples(index=False):
+                self._hoja.append([None if pd.isna(valor) else valor for valor in fila])
+        self._primero = False
+
+    def cerrar(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._libro is not None:
+            self._libro.save(self.ruta)
+            self._libro.close()
+
+
+def completar_cuota(data_frame):
+    """Calcular la columna cuota desde monto_solicitado, plazo, tasa y sistema si no viene en el archivo."""
+    if "cuota" in data_frame.columns or any(columna not in data_frame.columns for columna in COLUMNAS_CUOTA):
+        return data_frame
+    datos = data_frame[list(COLUMNAS_CUOTA)]
+    sistema = data_frame["sistema"].fillna(FRANCES).to_numpy() if "sistema" in data_frame.columns else FRANCES
+    # Un sistema desconocido deja la fila sin cuota, igual que un dato faltante
+    valido = sistema_valido(sistema)
+    completas = datos.notna().all(axis=1) & valido
+    cuota = calcular_cuota(
+        datos["monto_solicitado"].fillna(0).to_numpy(),
+        datos["tasa"].fillna(0).to_numpy(),
+        datos["plazo"].fillna(0).to_numpy(),
+        np.where(valido, sistema, FRANCES),
+    )
+    return data_frame.assign(cuota=pd.Series(cuota, index=data_frame.index).round().where(completas))
+
+
+def calificar_bloque(data_frame):
+    """Calificar un bloque; las filas con datos faltantes se marcan como incompletas."""
+    data_frame = completar_cuota(data_frame)
+    faltantes = [columna for columna in COLUMNAS_LOTE if columna not in data_frame.columns]
+    if faltantes:
+        raise KeyError(f"Faltan columnas para la evaluación: {', '.join(faltantes)}")
+    completas = data_frame[list(COLUMNAS_LOTE)].notna().all(axis=1)
+    if completas.all():
+        return calcular_calificacion_dataframe(data_frame)
+    resultado = data_frame.assign(puntaje_total=float("nan"), recomendacion=SIN_DATOS)
+    if completas.any():
+        calificadas = calcular_calificacion_dataframe(data_frame[completas])
+        resultado.loc[completas, "puntaje_total"] = calificadas["puntaje_total"]
+        resultado.loc[completas, "recomendacion"] = calificadas["recomendacion"]
+    return resultado
+
+
+def _campos_dictamen(fila):
+    """Nombre de archivo y argumentos de generate_detailed_pdf para una fila calificada."""
+    ingresos = fila["ingresos"]
+    deudas = fila["deudas"]
+    nombre = str(fila.get("nombre") or "Sin nombre")
+    # El nombre viene del archivo de entrada: se limpia antes de usarlo en la ruta
+    archivo = f"dictamen_credito_{parte_nombre_archivo(nombre)}_{fila['indice']}.pdf"
+    return archivo, dict(
+        nombre=nombre,
+        profesion=fila.get("perfil_comercial", ""),
+        ingresos=ingresos,
+        fecha_nacimiento=fila.get("fecha_nacimiento") or "No especificada",
+        empresa=fila.get("empresa", ""),
+        perfil_comercial=fila.get("perfil_comercial", ""),
+        producto=fila.get("producto", ""),
+        monto_solicitado=fila.get("monto_solicitado", 0),
+        plazo=fila.get("plazo", 0),
+        cuota=fila["cuota"],
+        garantia=fila.get("garantia", ""),
+        scoring=fila["faja"],
+        deuda_financiera=deudas,
+        ratio_deuda_ingresos=round(deudas / ingresos, 2) if ingresos > 0 else 0,
+        puntaje=fila["puntaje_total"],
+        dictamen=fila["recomendacion"],
+        comentarios=str(fila.get("comentarios") or ""),
+    )
+
+
+def _generar_pdf_fila(fila, directorio_pdf):
+    from .utils.pdf_maker import generate_detailed_pdf
+
+    archivo, campos = _campos_dictamen(fila)
+    (Path(directorio_pdf) / archivo).write_bytes(generate_detailed_pdf(**campos).getvalue())
+    return archivo
+
+
+def _filas_calificadas(calificado):
+    for indice, fila in zip(calificado.index, calificado.to_dict("records")):
+        if fila["recomendacion"] == SIN_DATOS:
+            yield indice, None
+        else:
+            yield indice, {clave: valor for clave, valor in fila.items() if not pd.isna(valor)}
+
+
+def dictamenes_de_bloques(bloques):
+    """Pares (archivo, campos) de los dictámenes de bloques ya calificados, para los lotes de pdf_maker."""
+    for calificado in bloques:
+        for indice, fila in _filas_calificadas(calificado):
+            if fila is not None:
+                yield _campos_dictamen({**fila, "indice": indice})
+
+
+def generar_lote_pdf(dictamenes, ruta):
+    """Escribir los dictámenes en un solo PDF (.pdf) o en un ZIP con un PDF por solicitante (.zip)."""
+    from .utils.pdf_maker import generate_batch_pdf, generate_batch_zip
+
+    sufijo = Path(ruta).suffix.lower()
+    if sufijo == ".pdf":
+        return generate_batch_pdf(dictamenes, str(ruta))
+    if sufijo == ".zip":
+        return generate_batch_zip(dictamenes, ruta)
+    raise ValueError(f"El lote de dictámenes debe ser .pdf o .zip: {ruta}")
+
+
+def procesar_tarea(bloque, directorio_pdf=None):
+    """Calificar un bloque y, si se indica directorio, generar un PDF por fila calificada."""
+    calificado = calificar_bloque(bloque)
+    if directorio_pdf:
+        archivos = [
+            "" if fila is None else _generar_pdf_fila({**fila, "indice": indice}, directorio_pdf)
+            for indice, fila in _filas_calificadas(calificado)
+        ]
+        calificado = calificado.assign(archivo_pdf=archivos)
+    return calificado
+
+
+def _tareas(bloques, tamano_tarea):
+    inicio = 0
+    for bloque in bloques:
+        bloque.index = range(inicio, inicio + len(bloque))
+        inicio += len(bloque)
+        for desde in range(0, len(bloque), tamano_tarea):
+            yield bloque.iloc[desde:desde + tamano_tarea]
+
+
+def procesar_en_paralelo(bloques, procesos=None, directorio_pdf=None, tamano_tarea=TAMANO_TAREA, ordenado=True):
+    """Repartir los bloques en tareas entre procesos y generar los resultados a medida que terminan.
+
+    Con ordenado=True los resultados salen en el orden de entrada; si no, en el
+    orden en que terminan. Se mantienen a lo sumo dos tareas pendientes por
+    proceso para que la memoria no crezca con el tamaño del archivo.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    max_pendientes = procesos * 2
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        pendientes = deque()
+        for tarea in _tareas(bloques, tamano_tarea):
+            pendientes.append(executor.submit(procesar_tarea, tarea, directorio_pdf))
+            while len(pendientes) >= max_pendientes:
+                yield from _recoger(pendientes, ordenado)
+        while pendientes:
+            yield from _recoger(pendientes, ordenado)
+
+
+def _recoger(pendientes, ordenado):
+    if ordenado:
+        yield pendientes.popleft().result()
+        return
+    terminadas, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+    for futuro in terminadas:
+        pendientes.remove(futuro)
+        yield futuro.result()
+
+
+def evaluar_archivo(
+    entrada,
+    salida,
+    tamano_bloque=TAMANO_BLOQUE,
+    renombrar=None,
+    progreso=sys.stderr,
+    procesos=1,
+    directorio_pdf=None,
+    tamano_tarea=TAMANO_TAREA,
+    ordenado=True,
+    lote_pdf=None,
+):
+    """Calificar el archivo de entrada completo y devolver la cantidad de filas procesadas.
+
+    Con lote_pdf (.pdf o .zip) los dictámenes se agregan a ese archivo a
+    medida que se escribe cada bloque calificado, sin juntarlos en memoria.
+    """
+    bloques = leer_bloques(entrada, tamano_bloque)
+    if renombrar:
+        bloques = (bloque.rename(columns=renombrar) for bloque in bloques)
+    if directorio_pdf:
+        Path(directorio_pdf).mkdir(parents=True, exist_ok=True)
+    if procesos == 1:
+        resultados = (procesar_tarea(tarea, directorio_pdf) for tarea in _tareas(bloques, tamano_bloque))
+    else:
+        resultados = procesar_en_paralelo(bloques, procesos, directorio_pdf, tamano_tarea, ordenado)
+
+    escritor = EscritorBloques(salida)
+    total = 0
+    inicio = time.perf_counter()
+    reportado = 0
+
+    def escritos():
+        nonlocal total, reportado
+        for resultado in resultados:
+            escritor.escribir(resultado)
+            total += len(resultado)
+            if progreso is not None and total - reportado >= tamano_bloque:
+                reportado = total
+                _reportar(total, inicio, progreso)
+            yield resultado
+        if progreso is not None and total != reportado:
+            _reportar(total, inicio, progreso)
+
+    try:
+        if lote_pdf:
+            # El lote consume los bloques: cada uno se escribe y se agrega al lote antes de leer el siguiente
+            generar_lote_pdf(dictamenes_de_bloques(escritos()), lote_pdf)
+        else:
+            for _ in escritos():
+                pass
+    finally:
+        escritor.cerrar()
+    return total
+
+
+def _reportar(total, inicio, progreso):
+    transcurrido = time.perf_counter() - inicio
+    print(
+        f"{total:,} filas procesadas ({total / transcurrido if transcurrido else 0:,.0f} filas/s)",
+        file=progreso,
+        flush=True,
+    )
+
+
+def _parse_renombrar(pares):
+    renombrar = {}
+    for par in pares or []:
+        origen, separador, destino = par.partition("=")
+        if not separador:
+            raise argparse.ArgumentTypeError(f"Use ORIGEN=DESTINO, se recibió: {par}")
+        renombrar[origen] = destino
+    return renombrar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluación crediticia masiva por bloques")
+    parser.add_argument("entrada", help="Archivo CSV, Excel (.xlsx) o Parquet con los solicitantes")
+    parser.add_argument("salida", help="Archivo de salida (CSV, Excel o Parquet)")
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Filas por bloque")
+    parser.add_argument(
+        "--renombrar",
+        action="append",
+        metavar="ORIGEN=DESTINO",
+        help=f"Mapear columnas de entrada a {', '.join(COLUMNAS_LOTE)}",
+    )
+    parser.add_argument("--pdf", metavar="DIRECTORIO", help="Generar un dictamen PDF por solicitante")
+    parser.add_argument(
+        "--pdf-lote",
+        metavar="ARCHIVO",
+        help="Juntar los dictámenes en un solo PDF (.pdf) o en un ZIP de PDFs (.zip)",
+    )
+    parser.add_argument(
+        "--procesos",
+        type=int,
+        default=1,
+        help="Procesos de trabajo (0 = uno por núcleo)",
+    )
+    parser.add_argument("--tarea", type=int, default=TAMANO_TAREA, help="Filas por tarea en modo paralelo")
+    parser.add_argument(
+        "--desordenado",
+        action="store_true",
+        help="Escribir los resultados en el orden en que terminan",
+    )
+    parser.add_argument("--silencioso", action="store_true", help="No mostrar el progreso")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    total = evaluar_archivo(
+        args.entrada,
+        args.salida,
+        tamano_bloque=args.bloque,
+        renombrar=_parse_renombrar(args.renombrar),
+        progreso=None if args.silencioso else sys.stderr,
+        procesos=args.procesos or None,
+        directorio_pdf=args.pdf,
+        tamano_tarea=args.tarea,
+        ordenado=not args.desordenado,
+        lote_pdf=args.pdf_lote,
+    )
+    transcurrido = time.perf_counter() - inicio
+    print(f"Total: {total:,} filas en {transcurrido:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
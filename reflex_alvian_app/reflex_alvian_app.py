@@ -1,11 +1,21 @@
 import reflex as rx
 import os
-from .components.forms import main_form, FormState
+from .components.forms import cerrar_pools, main_form, FormState, precargar_dependencias, ruta_subida_excel
+from .components.dashboard import dashboard, DashboardState
+from .utils.politica import observar_politica
+from .utils.evaluaciones import iniciar_registro
+from .utils.descargas import RUTA_DICTAMEN, descargar_dictamen
+from .utils.subidas import RUTA_SUBIDA
+from .utils.metricas import RUTA_METRICAS, metricas_endpoint, registrar_colector
+from .utils.cache_pdf import cache_pdf
+from .utils.calculos import cache_calificaciones
+from .utils.excel_deudas import cache_deudas
 
 
 def index() -> rx.Component:
     return rx.box(
         rx.vstack(
+            rx.link("Dashboard de cartera", href="/dashboard", align="right", width="100%"),
             main_form(FormState),
             spacing="4",  # Changed from "1.5em" to "4"
             font_size="1em",
@@ -13,10 +23,40 @@ def index() -> rx.Component:
         )
     )
 
+@registrar_colector
+def estadisticas_caches():
+    """Aciertos, fallos y ocupación de las caches del proceso."""
+    caches = {"calificacion": cache_calificaciones, "deudas": cache_deudas, "pdf": cache_pdf.memoria}
+    estadisticas = {(nombre,): cache.estadisticas() for nombre, cache in caches.items()}
+    return [
+        (f"alvian_cache_{campo}{sufijo}", tipo, ayuda, ("cache",),
+         {clave: valores[campo] for clave, valores in estadisticas.items()})
+        for campo, sufijo, tipo, ayuda in (
+            ("hits", "_total", "counter", "Aciertos de la cache"),
+            ("misses", "_total", "counter", "Fallos de la cache"),
+            ("entradas", "", "gauge", "Entradas en la cache"),
+            ("bytes", "", "gauge", "Bytes ocupados por la cache"),
+        )
+    ]
+
+
 # Initialize the app with the base state
 app = rx.App()
+app.register_lifespan_task(observar_politica)
+app.register_lifespan_task(iniciar_registro)
+app.register_lifespan_task(precargar_dependencias)
+app.register_lifespan_task(cerrar_pools)
+app.api.add_api_route(RUTA_DICTAMEN, descargar_dictamen, methods=["GET"])
+app.api.add_api_route(RUTA_METRICAS, metricas_endpoint, methods=["GET"])
+app.api.add_api_route(RUTA_SUBIDA, ruta_subida_excel(app), methods=["POST"])
 app.add_page(
     index,
     route="/",
     title="Sistema de Evaluación Crediticia",
-    )
\ No newline at end of file
+    )
+app.add_page(
+    dashboard,
+    route="/dashboard",
+    title="Dashboard de Cartera",
+    on_load=DashboardState.cargar_resumen,
+)
\ No newline at end of file
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+FRANCES = "Francés"
+ALEMAN = "Alemán"
+SISTEMAS = (FRANCES, ALEMAN)
+_NOMBRES_SISTEMA = {"francés": FRANCES, "frances": FRANCES, "alemán": ALEMAN, "aleman": ALEMAN}
+
+
+@dataclass(frozen=True)
+class Cronograma:
+    """Cronogramas de pago, una fila por préstamo y una columna por mes.
+
+    Los meses posteriores al plazo de cada préstamo quedan en 0. saldo es el
+    capital pendiente después de pagar la cuota de ese mes.
+    """
+
+    plazo: np.ndarray
+    cuota: np.ndarray
+    interes: np.ndarray
+    amortizacion: np.ndarray
+    saldo: np.ndarray
+
+
+def _nombres(sistema):
+    return np.char.lower(np.char.strip(np.asarray(sistema, dtype=str)))
+
+
+def sistema_valido(sistema):
+    """True donde el sistema es uno de SISTEMAS (sin distinguir mayúsculas ni acentos)."""
+    return np.isin(_nombres(sistema), list(_NOMBRES_SISTEMA))
+
+
+def _es_aleman(sistema):
+    nombres = _nombres(sistema)
+    desconocidos = set(np.unique(nombres)) - set(_NOMBRES_SISTEMA)
+    if desconocidos:
+        raise ValueError(f"Sistema de amortización desconocido: {', '.join(sorted(desconocidos))}")
+    return np.isin(nombres, ("alemán", "aleman"))
+
+
+def _parametros(monto, tasa_anual, plazo):
+    monto = np.asarray(monto, dtype=np.float64)
+    # tasa_anual es la tasa nominal anual en porcentaje, capitalizada mensualmente
+    tasa = np.asarray(tasa_anual, dtype=np.float64) / 1200
+    plazo = np.asarray(plazo, dtype=np.int64)
+    return monto, tasa, plazo
+
+
+def _cuota_francesa(monto, tasa, plazo):
+    meses = np.maximum(plazo, 1)
+    sin_interes = monto / meses
+    con_interes = monto * tasa / -np.expm1(-meses * np.log1p(np.where(tasa == 0, 1.0, tasa)))
+    return np.where(tasa == 0, sin_interes, con_interes)
+
+
+def calcular_cuota(monto, tasa_anual, plazo, sistema=FRANCES):
+    """Cuota mensual del préstamo; acepta escalares o arrays de igual forma.
+
+    En el sistema alemán la cuota baja mes a mes y se devuelve la primera,
+    que es la más alta y la que se usa para medir la capacidad de pago.
+    Con plazo <= 0 la cuota es 0.
+    """
+    monto, tasa, plazo = _parametros(monto, tasa_anual, plazo)
+    meses = np.maximum(plazo, 1)
+    cuota = np.where(
+        _es_aleman(sistema),
+        monto / meses + monto * tasa,
+        _cuota_francesa(monto, tasa, plazo),
+    )
+    cuota = np.where(plazo > 0, cuota, 0.0)
+    return cuota.item() if cuota.ndim == 0 else cuota
+
+
+def generar_cronogramas(monto, tasa_anual, plazo, sistema=FRANCES):
+    """Cronogramas completos de muchos préstamos a la vez, sin recorrer los meses en Python.
+
+    Ambos sistemas se resuelven con el saldo de cada mes: francés con la
+    fórmula cerrada de la anualidad y alemán con amortización constante; el
+    interés es saldo anterior * tasa y la amortización la caída del saldo.
+    """
+    monto, tasa, plazo = _parametros(monto, tasa_anual, plazo)
+    monto, tasa, plazo, aleman = np.broadcast_arrays(
+        np.atleast_1d(monto), np.atleast_1d(tasa), np.atleast_1d(plazo), np.atleast_1d(_es_aleman(sistema))
+    )
+    meses = np.maximum(plazo, 1)[:, None]
+    mes = np.arange(1, max(int(plazo.max(initial=0)), 1) + 1)[None, :]
+    monto, tasa = monto[:, None], tasa[:, None]
+
+    fraccion_lineal = np.clip(mes / meses, 0.0, 1.0)
+    # Saldo francés: monto * ((1+i)^n - (1+i)^k) / ((1+i)^n - 1)
+    crecimiento = np.log1p(np.where(tasa == 0, 1.0, tasa))
+    total = np.expm1(meses * crecimiento)
+    pagado = np.expm1(np.minimum(mes, meses) * crecimiento)
+    fraccion_francesa = np.where(tasa == 0, fraccion_lineal, pagado / total)
+    saldo = monto * (1.0 - np.where(aleman[:, None], fraccion_lineal, fraccion_francesa))
+
+    vigente = mes <= plazo[:, None]
+    saldo = np.where(mes >= meses, 0.0, saldo)
+    saldo_anterior = np.concatenate([monto, saldo[:, :-1]], axis=1)
+    interes = np.where(vigente, saldo_anterior * tasa, 0.0)
+    amortizacion = np.where(vigente, saldo_anterior - saldo, 0.0)
+    return Cronograma(
+        plazo=plazo,
+        cuota=amortizacion + interes,
+        interes=interes,
+        amortizacion=amortizacion,
+        saldo=np.where(vigente, saldo, 0.0),
+    )
+
+
+def generar_cronograma(monto, tasa_anual, plazo, sistema=FRANCES):
+    """Cronograma de un solo préstamo, con arrays de largo plazo."""
+    cronogramas = generar_cronogramas(monto, tasa_anual, plazo, sistema)
+    meses = int(cronogramas.plazo[0])
+    return Cronograma(
+        plazo=cronogramas.plazo[0],
+        cuota=cronogramas.cuota[0, :meses],
+        interes=cronogramas.interes[0, :meses],
+        amortizacion=cronogramas.amortizacion[0, :meses],
+        saldo=cronogramas.saldo[0, :meses],
+    )
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Cache LRU thread-safe acotada por cantidad de entradas y/o bytes, con TTL opcional.
+
+    tamano es la función que mide cada valor para el límite max_bytes.
+    """
+
+    def __init__(self, max_entradas=None, max_bytes=None, ttl=None, tamano=len):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.tamano = tamano
+        self._datos = OrderedDict()  # clave -> (vencimiento, tamaño, valor)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave, defecto=None):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[0] is not None and entrada[0] <= time.monotonic():
+                self._quitar(clave)
+                entrada = None
+            if entrada is None:
+                self.misses += 1
+                return defecto
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return entrada[2]
+
+    def put(self, clave, valor):
+        tamano = self.tamano(valor) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and tamano > self.max_bytes:
+            return
+        vencimiento = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+            self._datos[clave] = (vencimiento, tamano, valor)
+            self._bytes += tamano
+            while (self.max_entradas is not None and len(self._datos) > self.max_entradas) or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._quitar(next(iter(self._datos)))
+
+    def pop(self, clave, defecto=None):
+        with self._lock:
+            if clave not in self._datos:
+                return defecto
+            return self._quitar(clave)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+
+    def _quitar(self, clave):
+        _, tamano, valor = self._datos.pop(clave)
+        self._bytes -= tamano
+        return valor
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def estadisticas(self):
+        consultas = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / consultas if consultas else 0.0,
+            "entradas": len(self._datos),
+            "bytes": self._bytes,
+        }
@@ -0,0 +1,111 @@
+import hashlib
+import importlib.metadata
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .cache import CacheLRU
+
+PDF_CACHE_DIR = Path(os.environ.get("PDF_CACHE_DIR", ".pdf_cache"))
+MAX_BYTES_MEMORIA = 64 * 1024 * 1024
+MAX_BYTES_DISCO = 1024 * 1024 * 1024
+
+
+def _version_plantilla():
+    """Huella del diseño del dictamen: el código de pdf_maker.py y la versión de ReportLab.
+
+    Se lee el archivo sin importarlo para no cargar ReportLab al arrancar.
+    """
+    huella = hashlib.sha256(Path(__file__).with_name("pdf_maker.py").read_bytes())
+    try:
+        huella.update(importlib.metadata.version("reportlab").encode())
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    return huella.hexdigest()[:16]
+
+
+# Cambia con cualquier cambio del diseño, así los PDF cacheados de una versión anterior no se reutilizan
+VERSION_PLANTILLA = _version_plantilla()
+
+
+def clave_pdf(pdf_kwargs):
+    """Hash de los argumentos de generate_detailed_pdf y de VERSION_PLANTILLA.
+
+    Se incluye el tipo de cada valor porque 15000000 y 15000000.0 se imprimen
+    distinto en el dictamen.
+    """
+    normalizado = sorted((nombre, type(valor).__name__, valor) for nombre, valor in pdf_kwargs.items())
+    contenido = json.dumps([VERSION_PLANTILLA, normalizado], ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+class CachePdf:
+    """Cache de dictámenes por contenido: LRU en memoria y archivos <hash>.pdf en disco.
+
+    El disco también funciona como LRU: cada acierto actualiza la fecha del
+    archivo y al superar max_bytes_disco se borran los menos usados.
+    """
+
+    def __init__(self, directorio=PDF_CACHE_DIR, max_bytes_memoria=MAX_BYTES_MEMORIA, max_bytes_disco=MAX_BYTES_DISCO):
+        self.directorio = Path(directorio)
+        self.max_bytes_disco = max_bytes_disco
+        self.memoria = CacheLRU(max_bytes=max_bytes_memoria)
+        self._disco = None  # nombre de archivo -> tamaño, del menos al más reciente
+        self._bytes_disco = 0
+        self._lock = threading.Lock()
+
+    def _indice_disco(self):
+        if self._disco is None:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            archivos = sorted(self.directorio.glob("*.pdf"), key=lambda archivo: archivo.stat().st_mtime)
+            self._disco = OrderedDict((archivo.name, archivo.stat().st_size) for archivo in archivos)
+            self._bytes_disco = sum(self._disco.values())
+        return self._disco
+
+    def get(self, clave):
+        nombre = f"{clave}.pdf"
+        pdf_bytes = self.memoria.get(clave)
+        if pdf_bytes is not None:
+            with self._lock:
+                if self._disco is not None and nombre in self._disco:
+                    self._disco.move_to_end(nombre)
+            return pdf_bytes
+        with self._lock:
+            disco = self._indice_disco()
+            if nombre not in disco:
+                return None
+            disco.move_to_end(nombre)
+        ruta = self.directorio / nombre
+        try:
+            pdf_bytes = ruta.read_bytes()
+            os.utime(ruta)
+        except FileNotFoundError:
+            with self._lock:
+                self._bytes_disco -= disco.pop(nombre, 0)
+            return None
+        self.memoria.put(clave, pdf_bytes)
+        return pdf_bytes
+
+    def put(self, clave, pdf_bytes):
+        self.memoria.put(clave, pdf_bytes)
+        nombre = f"{clave}.pdf"
+        with self._lock:
+            disco = self._indice_disco()
+            if nombre in disco:
+                disco.move_to_end(nombre)
+                return
+            # Escritura atómica: otro proceso nunca ve un PDF a medio escribir
+            temporal = self.directorio / f"{nombre}.{os.getpid()}.tmp"
+            temporal.write_bytes(pdf_bytes)
+            os.replace(temporal, self.directorio / nombre)
+            disco[nombre] = len(pdf_bytes)
+            self._bytes_disco += len(pdf_bytes)
+            while self._bytes_disco > self.max_bytes_disco and len(disco) > 1:
+                viejo, tamano = disco.popitem(last=False)
+                self._bytes_disco -= tamano
+                (self.directorio / viejo).unlink(missing_ok=True)
+
+
+cache_pdf = CachePdf()
@@ -1,126 +1,94 @@
+import os
+import time
 from datetime import date
 
+from .cache import CacheLRU
+from .metricas import CALIFICACION_SEGUNDOS
+from .politica import obtener_reglas
+from .reglas import calcular_dti
+
+CALIFICACION_CACHE_MAX = int(os.environ.get("CALIFICACION_CACHE_MAX", "10000"))
+
+# Calificaciones ya calculadas: (versión, hash de la política, clave normalizada) -> resultado
+cache_calificaciones = CacheLRU(max_entradas=CALIFICACION_CACHE_MAX)
+
 # Función para calcular el puntaje de edad
 def calcular_puntaje_edad(edad):
-    edad = int(edad)
-    if 20 <= edad <= 25:
-        return 5
-    elif 26 <= edad <= 35:
-        return 10
-    elif 36 <= edad <= 50:
-        return 15
-    elif 51 <= edad <= 65:
-        return 20
-    else:
-        return 0  # Fuera del rango
+    return obtener_reglas().puntaje_edad(edad)
 
 # Función para calcular el puntaje de ingresos
 def calcular_puntaje_ingresos(ingresos):
-    ingresos = int(ingresos)
-    if ingresos < 3_000_000:
-        return 5
-    elif 3_000_000 <= ingresos < 5_000_000:
-        return 10
-    elif 5_000_000 <= ingresos <= 10_000_000:
-        return 15
-    else:  # ingresos > 10_000_000
-        return 20
+    return obtener_reglas().puntaje_ingresos(ingresos)
 
 # Función para calcular el puntaje de faja
 def calcular_puntaje_faja(faja):
-    faja_dict = {"M-N": 5, "I-L": 10, "E-H": 15, "A-D": 20}
-    faja = faja.upper()  # Convertir la letra a mayúscula para consistencia
-    for rango, puntaje in faja_dict.items():
-        inicio, fin = rango.split("-")  # Dividir el rango en inicio y fin
-        if inicio <= faja <= fin:  # Verificar si la letra está en el rango
-            return puntaje
-    return 0  # Retornar 0 si no pertenece a ningún rango
+    return obtener_reglas().puntaje_faja(faja)
 
 # Función para calcular el puntaje de antigüedad laboral
 def calcular_puntaje_antiguedad(antiguedad):
-    puntajes = {
-        "6 meses a un año": 5,
-        "1 a 2 años": 10,
-        "3 a 5 años": 15,
-        "Más de 5 años": 20
-    }
-    
-    return puntajes.get(antiguedad, 0)  # Retorna 0 si el parámetro no coincide con ninguna clave
+    return obtener_reglas().puntaje_antiguedad(antiguedad)
 
 # Función para calcular el puntaje de activos
 def calcular_puntaje_activos(activos):
-    activos_dict = {
-        "ninguno": 5,
-        "vehículo": 10,
-        "inmueble": 15,
-        "vehículo e inmueble": 20
-    }
-    return activos_dict.get(activos.lower(), 0)  # Retorna 0 si no coincide
-
-
-def calcular_dti(deudas, ingresos, cuota):
-    ingresos = int(ingresos)
-    deudas = int(deudas)
-    cuota = int(cuota)
-    if ingresos == 0:
-        return 0
-    return ((deudas+cuota)/ingresos)*100 
+    return obtener_reglas().puntaje_activos(activos)
 
 # Función para calcular el puntaje de ratio deuda/ingreso (DTI)
 def calcular_puntaje_dti(dti):
-    if dti > 50:
-        return 5
-    elif 40 <= dti <= 49:
-        return 10
-    elif 20 <= dti <= 39:
-        return 15
-    elif dti < 20:
-        return 20
-    else:
-        return 0
+    return obtener_reglas().puntaje_dti(dti)
+
+# Clave de cache con la misma normalización que aplican las reglas: montos y
+# edad se truncan a int, la faja se compara en mayúsculas y los activos en minúsculas
+def clave_calificacion(edad, ingresos, faja, antiguedad, activos, deudas, cuota):
+    return (int(edad), int(ingresos), faja.upper(), antiguedad, activos.lower(), int(deudas), int(cuota))
+
 
 # Función para calcular la calificación final
-def calcular_calificacion_final(edad, ingresos, faja, antiguedad, activos, deudas, cuota):
-    ponderaciones = {
-        "edad": 0.10,
-        "ingresos": 0.20,
-        "faja": 0.20,
-        "antiguedad": 0.10,
-        "activos": 0.20,
-        "dti": 0.20
-    }
-    
-    # Calcular puntajes ponderados
-    puntaje_edad = calcular_puntaje_edad(edad) * ponderaciones["edad"]
-    puntaje_ingresos = calcular_puntaje_ingresos(ingresos) * ponderaciones["ingresos"]
-    puntaje_faja = calcular_puntaje_faja(faja) * ponderaciones["faja"]
-    puntaje_antiguedad = calcular_puntaje_antiguedad(antiguedad) * ponderaciones["antiguedad"]
-    puntaje_activos = calcular_puntaje_activos(activos) * ponderaciones["activos"]
-    puntaje_dti = calcular_puntaje_dti(calcular_dti(deudas, ingresos, cuota)) * ponderaciones["dti"]
-    
-    # Sumar los puntajes ponderados
-    puntaje_total = sum([
-        puntaje_edad,
-        puntaje_ingresos,
-        puntaje_faja,
-        puntaje_antiguedad,
-        puntaje_activos,
-        puntaje_dti
-    ])
-    
-    # Dictamen final
-    if 5 <= puntaje_total < 10:
-        recomendacion = "No recomendado"
-    elif 10 <= puntaje_total < 16:
-        recomendacion = "Aprobado con condiciones"
-    elif 16 <= puntaje_total <= 20:
-        recomendacion = "Aprobado"
-    else:
-        recomendacion = "No definido"
-    
-    return puntaje_total, recomendacion
+# reglas: las ya obtenidas por quien llama, para registrar la misma versión con la que se calificó
+def calcular_calificacion_final(edad, ingresos, faja, antiguedad, activos, deudas, cuota, reglas=None):
+    inicio = time.perf_counter()
+    reglas = reglas or obtener_reglas()
+    # El hash del contenido separa una política recargada con la misma versión
+    clave = (
+        reglas.version, reglas.huella, clave_calificacion(edad, ingresos, faja, antiguedad, activos, deudas, cuota)
+    )
+    resultado = cache_calificaciones.get(clave)
+    if resultado is None:
+        resultado = reglas.calificar(edad, ingresos, faja, antiguedad, activos, deudas, cuota)
+        cache_calificaciones.put(clave, resultado)
+    CALIFICACION_SEGUNDOS.observar(time.perf_counter() - inicio)
+    return resultado
+
+
+def estadisticas_calificacion():
+    """Aciertos, fallos y tamaño de la cache de calcular_calificacion_final."""
+    return cache_calificaciones.estadisticas()
+
+
+# Columnas esperadas por la evaluación en lote, en el orden de calcular_calificacion_final
+COLUMNAS_LOTE = ("edad", "ingresos", "faja", "antiguedad", "activos", "deudas", "cuota")
+
+
+# Función para calcular la calificación final de muchos solicitantes a la vez
+def calcular_calificacion_lote(edad, ingresos, faja, antiguedad, activos, deudas, cuota):
+    """Versión vectorizada de calcular_calificacion_final.
+
+    Recibe columnas (listas, arrays o Series) de igual longitud y devuelve dos
+    arrays: puntaje_total (float) y recomendacion (str), con los mismos valores
+    que la función escalar fila a fila.
+    """
+    return obtener_reglas().calificar_lote(edad, ingresos, faja, antiguedad, activos, deudas, cuota)
 
 
+# Función para calificar un DataFrame con las columnas de COLUMNAS_LOTE
+def calcular_calificacion_dataframe(data_frame):
+    """Devuelve una copia del DataFrame con las columnas puntaje_total y recomendacion."""
+    faltantes = [columna for columna in COLUMNAS_LOTE if columna not in data_frame.columns]
+    if faltantes:
+        raise KeyError(f"Faltan columnas para la evaluación: {', '.join(faltantes)}")
+    puntaje_total, recomendacion = calcular_calificacion_lote(
+        *(data_frame[columna].to_numpy() for columna in COLUMNAS_LOTE)
+    )
+    return data_frame.assign(puntaje_total=puntaje_total, recomendacion=recomendacion)
 
 
 # Ejemplo de uso
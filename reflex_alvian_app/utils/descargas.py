@@ -0,0 +1,95 @@
+import secrets
+import threading
+import time
+from urllib.parse import quote
+
+import reflex as rx
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from reflex.utils import prerequisites
+
+# Ruta del backend que entrega los dictámenes generados
+RUTA_DICTAMEN = "/api/dictamen/{token}"
+CHUNK_SIZE = 64 * 1024
+TTL_DESCARGA = 300  # segundos que un PDF queda disponible para descargar
+MAX_PENDIENTES = 256
+
+_pendientes = {}  # token -> (vencimiento, filename, pdf_bytes)
+_lock = threading.Lock()
+_redis = None
+
+
+def _cliente_redis():
+    # Con varias réplicas la descarga puede llegar a otra instancia que la que
+    # generó el PDF: si hay REDIS_URL los pendientes se guardan en Redis.
+    global _redis
+    if _redis is None:
+        _redis = prerequisites.get_redis() or False
+    return _redis or None
+
+
+def usar_redis(cliente):
+    """Reemplazar el cliente Redis de los pendientes (None vuelve a la memoria local)."""
+    global _redis
+    _redis = cliente if cliente is not None else False
+
+
+def _clave_redis(token):
+    return f"dictamen_{token}"
+
+
+def _purgar(ahora):
+    vencidos = [token for token, (vencimiento, _, _) in _pendientes.items() if vencimiento <= ahora]
+    for token in vencidos:
+        del _pendientes[token]
+    while len(_pendientes) >= MAX_PENDIENTES:
+        _pendientes.pop(next(iter(_pendientes)))
+
+
+async def registrar_pdf(filename, pdf_bytes):
+    """Guardar el PDF por TTL_DESCARGA segundos y devolver el token de descarga."""
+    token = secrets.token_urlsafe(16)
+    redis = _cliente_redis()
+    if redis is not None:
+        await redis.hset(_clave_redis(token), mapping={"filename": filename, "pdf": pdf_bytes})
+        await redis.expire(_clave_redis(token), TTL_DESCARGA)
+        return token
+    ahora = time.monotonic()
+    with _lock:
+        _purgar(ahora)
+        _pendientes[token] = (ahora + TTL_DESCARGA, filename, pdf_bytes)
+    return token
+
+
+def url_descarga(token):
+    """URL absoluta del backend para descargar el PDF registrado con token."""
+    return rx.config.get_config().api_url.rstrip("/") + RUTA_DICTAMEN.format(token=token)
+
+
+def _iter_chunks(data):
+    vista = memoryview(data)
+    for inicio in range(0, len(vista), CHUNK_SIZE):
+        yield bytes(vista[inicio:inicio + CHUNK_SIZE])
+
+
+async def descargar_dictamen(token: str):
+    """Entregar el PDF en bloques directamente desde memoria (o Redis), sin archivo intermedio."""
+    redis = _cliente_redis()
+    if redis is not None:
+        guardado = await redis.hgetall(_clave_redis(token))
+        pendiente = (None, guardado[b"filename"].decode(), guardado[b"pdf"]) if guardado else None
+    else:
+        with _lock:
+            _purgar(time.monotonic())
+            pendiente = _pendientes.get(token)
+    if pendiente is None:
+        raise HTTPException(status_code=404, detail="Dictamen no encontrado o vencido")
+    _, filename, pdf_bytes = pendiente
+    return StreamingResponse(
+        _iter_chunks(pdf_bytes),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+            "Content-Length": str(len(pdf_bytes)),
+        },
+    )
@@ -0,0 +1,30 @@
+from reflex.config import get_config
+from reflex.state import State, StateManagerRedis
+
+
+def redis_local(servidor=None):
+    """Cliente Redis asíncrono en memoria (fakeredis) para pruebas sin servidor.
+
+    Los clientes creados con el mismo servidor comparten los datos, igual que
+    varias réplicas conectadas al mismo Redis.
+    """
+    try:
+        import fakeredis
+    except ImportError as e:
+        raise RuntimeError("El Redis local requiere fakeredis: pip install fakeredis") from e
+    return fakeredis.aioredis.FakeRedis(server=servidor)
+
+
+def crear_state_manager(redis, state=State):
+    """StateManagerRedis sobre un cliente dado, con los tiempos de rxconfig.
+
+    En producción Reflex lo crea solo cuando REDIS_URL está definido; esta
+    función sirve para montar réplicas contra redis_local() en pruebas.
+    """
+    config = get_config()
+    return StateManagerRedis(
+        state=state,
+        redis=redis,
+        token_expiration=config.redis_token_expiration,
+        lock_expiration=config.redis_lock_expiration,
+    )
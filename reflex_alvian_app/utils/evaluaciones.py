@@ -0,0 +1,279 @@
+import atexit
+import datetime
+import json
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+
+from .reglas import calcular_dti
+
+# Base SQLite con el historial de evaluaciones
+RUTA_EVALUACIONES = Path(os.environ.get("EVALUACIONES_DB", "evaluaciones.db"))
+TAMANO_LOTE = 200  # filas máximas por transacción
+ESPERA_LOTE = 0.05  # segundos que se esperan más filas antes de escribir
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS evaluaciones (
+    id INTEGER PRIMARY KEY,
+    ci TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    puntaje REAL NOT NULL,
+    recomendacion TEXT NOT NULL,
+    version_politica TEXT,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_ci_fecha ON evaluaciones (ci, fecha);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_fecha ON evaluaciones (fecha);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_recomendacion ON evaluaciones (recomendacion, fecha);
+CREATE TABLE IF NOT EXISTS resumen_evaluaciones (
+    producto TEXT NOT NULL,
+    garantia TEXT NOT NULL,
+    faja TEXT NOT NULL,
+    recomendacion TEXT NOT NULL,
+    rango_puntaje INTEGER NOT NULL,
+    evaluaciones INTEGER NOT NULL,
+    suma_puntaje REAL NOT NULL,
+    con_dti INTEGER NOT NULL,
+    suma_dti REAL NOT NULL,
+    PRIMARY KEY (producto, garantia, faja, recomendacion, rango_puntaje)
+) WITHOUT ROWID;
+"""
+_COLUMNAS = ("ci", "nombre", "fecha", "puntaje", "recomendacion", "version_politica", "datos")
+_INSERTAR = f"INSERT INTO evaluaciones ({', '.join(_COLUMNAS)}) VALUES ({', '.join('?' * len(_COLUMNAS))})"
+
+# Resumen por producto, garantía, faja, recomendación y puntaje entero, que se
+# actualiza en la misma transacción que el historial. Su tamaño depende de la
+# cantidad de combinaciones y no de la cantidad de evaluaciones.
+DIMENSIONES_RESUMEN = ("producto", "garantia", "faja")
+SIN_DATO = "Sin dato"
+_ACUMULAR_RESUMEN = """
+INSERT INTO resumen_evaluaciones
+    (producto, garantia, faja, recomendacion, rango_puntaje, evaluaciones, suma_puntaje, con_dti, suma_dti)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (producto, garantia, faja, recomendacion, rango_puntaje) DO UPDATE SET
+    evaluaciones = evaluaciones + excluded.evaluaciones,
+    suma_puntaje = suma_puntaje + excluded.suma_puntaje,
+    con_dti = con_dti + excluded.con_dti,
+    suma_dti = suma_dti + excluded.suma_dti
+"""
+
+
+def normalizar_ci(ci):
+    """CI o RUC sin espacios ni puntos separadores de miles, en mayúsculas."""
+    return "".join(str(ci or "").split()).replace(".", "").upper()
+
+
+def clave_resumen(recomendacion, puntaje, datos):
+    """Fila del resumen a la que suma una evaluación, y su DTI en % (None sin ingresos)."""
+    producto, garantia, faja = (
+        str(datos.get(dimension) or "").strip() or SIN_DATO for dimension in DIMENSIONES_RESUMEN
+    )
+    dti = None
+    try:
+        ingresos = float(datos.get("ingresos") or 0)
+        if ingresos > 0:
+            dti = calcular_dti(datos.get("deuda_financiera") or 0, ingresos, datos.get("cuota") or 0)
+    except (TypeError, ValueError):
+        pass
+    return (producto, garantia, faja.upper(), recomendacion, int(puntaje // 1)), dti
+
+
+def _acumular_resumen(conexion, claves):
+    """Sumar al resumen una lista de (clave, puntaje, dti), agrupada antes de escribir."""
+    grupos = {}
+    for clave, puntaje, dti in claves:
+        grupo = grupos.setdefault(clave, [0, 0.0, 0, 0.0])
+        grupo[0] += 1
+        grupo[1] += puntaje
+        if dti is not None:
+            grupo[2] += 1
+            grupo[3] += dti
+    conexion.executemany(_ACUMULAR_RESUMEN, [clave + tuple(grupo) for clave, grupo in grupos.items()])
+
+
+def reconstruir_resumen(conexion):
+    """Recalcular el resumen desde el historial completo (bases anteriores al resumen)."""
+    with conexion:
+        conexion.execute("DELETE FROM resumen_evaluaciones")
+        cursor = conexion.execute("SELECT puntaje, recomendacion, datos FROM evaluaciones")
+        while True:
+            filas = cursor.fetchmany(10_000)
+            if not filas:
+                break
+            claves = []
+            for puntaje, recomendacion, datos in filas:
+                clave, dti = clave_resumen(recomendacion, puntaje, json.loads(datos))
+                claves.append((clave, puntaje, dti))
+            _acumular_resumen(conexion, claves)
+
+
+def conectar(ruta):
+    """Conexión en modo WAL: las lecturas no esperan a la escritura en curso."""
+    conexion = sqlite3.connect(ruta, check_same_thread=False)
+    conexion.row_factory = sqlite3.Row
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+
+def completar_resumen(conexion):
+    """Bases creadas antes del resumen: completarlo una vez desde el historial (puede tardar)."""
+    if (
+        conexion.execute("SELECT 1 FROM evaluaciones LIMIT 1").fetchone() is not None
+        and conexion.execute("SELECT 1 FROM resumen_evaluaciones LIMIT 1").fetchone() is None
+    ):
+        reconstruir_resumen(conexion)
+
+
+class RegistroEvaluaciones:
+    """Historial de evaluaciones con escritura en lotes desde un hilo propio.
+
+    registrar() solo encola la fila; el hilo escritor agrupa lo que llegue
+    en ESPERA_LOTE segundos (hasta TAMANO_LOTE filas) en una transacción.
+    Las consultas usan una conexión por hilo y ven también lo encolado.
+    """
+
+    def __init__(self, ruta=RUTA_EVALUACIONES):
+        self.ruta = Path(ruta)
+        self._cola = queue.Queue()
+        self._pendientes = {}  # ci -> última fila todavía no escrita
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._lectura = threading.local()
+
+    def iniciar(self):
+        """Arrancar el hilo escritor; abrir la base y completar el resumen se hace en ese hilo."""
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._escribir, name="registro-evaluaciones", daemon=True)
+                self._hilo.start()
+                atexit.register(self.cerrar)
+
+    def registrar(self, ci, nombre, puntaje, recomendacion, datos, version_politica=None, fecha=None):
+        """Encolar una evaluación para guardarla; no espera a la base."""
+        fila = {
+            "ci": normalizar_ci(ci),
+            "nombre": nombre or "",
+            "fecha": fecha or datetime.datetime.now().isoformat(timespec="seconds"),
+            "puntaje": float(puntaje),
+            "recomendacion": recomendacion,
+            "version_politica": None if version_politica is None else str(version_politica),
+            "datos": json.dumps(datos, ensure_ascii=False),
+        }
+        fila["resumen"] = clave_resumen(fila["recomendacion"], fila["puntaje"], datos)
+        self.iniciar()
+        if fila["ci"]:
+            with self._lock:
+                self._pendientes[fila["ci"]] = fila
+        self._cola.put(fila)
+
+    def _escribir(self):
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        conexion = conectar(self.ruta)
+        completar_resumen(conexion)
+        while True:
+            lote = [self._cola.get()]
+            try:
+                while len(lote) < TAMANO_LOTE:
+                    lote.append(self._cola.get(timeout=ESPERA_LOTE))
+            except queue.Empty:
+                pass
+            filas = [fila for fila in lote if fila is not None]
+            try:
+                with conexion:
+                    conexion.executemany(_INSERTAR, [tuple(fila[c] for c in _COLUMNAS) for fila in filas])
+                    _acumular_resumen(
+                        conexion, [(fila["resumen"][0], fila["puntaje"], fila["resumen"][1]) for fila in filas]
+                    )
+            except sqlite3.Error as e:
+                print(f"Error al guardar {len(filas)} evaluaciones: {str(e)}")
+            with self._lock:
+                for fila in filas:
+                    if self._pendientes.get(fila["ci"]) is fila:
+                        del self._pendientes[fila["ci"]]
+            for _ in lote:
+                self._cola.task_done()
+            if None in lote:
+                conexion.close()
+                return
+
+    def esperar(self):
+        """Bloquear hasta que todo lo encolado esté escrito."""
+        if self._hilo is not None:
+            self._cola.join()
+
+    def cerrar(self):
+        """Escribir lo pendiente y detener el hilo escritor."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None and hilo.is_alive():
+            self._cola.put(None)
+            hilo.join()
+
+    def _conexion_lectura(self):
+        conexion = getattr(self._lectura, "conexion", None)
+        if conexion is None:
+            conexion = self._lectura.conexion = conectar(self.ruta)
+        return conexion
+
+    def ultima_evaluacion(self, ci):
+        """Última evaluación registrada para la CI/RUC, o None.
+
+        Devuelve un dict con las columnas de la tabla y datos ya decodificado.
+        """
+        ci = normalizar_ci(ci)
+        if not ci:
+            return None
+        with self._lock:
+            fila = self._pendientes.get(ci)
+        if fila is None:
+            if not self.ruta.exists():
+                return None
+            fila = self._conexion_lectura().execute(
+                "SELECT * FROM evaluaciones WHERE ci = ? ORDER BY fecha DESC, id DESC LIMIT 1", (ci,)
+            ).fetchone()
+            if fila is None:
+                return None
+        evaluacion = {columna: fila[columna] for columna in fila.keys() if columna != "resumen"}
+        evaluacion["datos"] = json.loads(evaluacion["datos"])
+        return evaluacion
+
+    def resumen(self, dimension):
+        """Totales del resumen agrupados por dimension (producto, garantia o faja) y recomendación.
+
+        Lee solo la tabla de resumen, así el costo no crece con el historial.
+        Devuelve filas con valor, recomendacion, evaluaciones, suma_puntaje,
+        con_dti y suma_dti; las evaluaciones todavía en cola no se incluyen.
+        """
+        if dimension not in DIMENSIONES_RESUMEN:
+            raise ValueError(f"Dimensión de resumen desconocida: {dimension}")
+        if not self.ruta.exists():
+            return []
+        filas = self._conexion_lectura().execute(
+            f"SELECT {dimension} AS valor, recomendacion, SUM(evaluaciones) AS evaluaciones, "
+            "SUM(suma_puntaje) AS suma_puntaje, SUM(con_dti) AS con_dti, SUM(suma_dti) AS suma_dti "
+            f"FROM resumen_evaluaciones GROUP BY {dimension}, recomendacion ORDER BY {dimension}, recomendacion"
+        ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def distribucion_puntajes(self):
+        """Evaluaciones por puntaje entero y recomendación, desde el resumen."""
+        if not self.ruta.exists():
+            return []
+        filas = self._conexion_lectura().execute(
+            "SELECT rango_puntaje, recomendacion, SUM(evaluaciones) AS evaluaciones FROM resumen_evaluaciones "
+            "GROUP BY rango_puntaje, recomendacion ORDER BY rango_puntaje, recomendacion"
+        ).fetchall()
+        return [dict(fila) for fila in filas]
+
+
+registro_evaluaciones = RegistroEvaluaciones()
+
+
+async def iniciar_registro():
+    """Tarea de arranque: abrir la base de evaluaciones antes del primer envío, fuera del event loop."""
+    registro_evaluaciones.iniciar()
@@ -0,0 +1,226 @@
+import math
+import os
+import posixpath
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+
+from .cache import CacheLRU
+
+# Columna (base 0) con el saldo de deuda en los reportes del buró
+COLUMNA_DEUDA = 4
+# Filas iniciales que no se suman: encabezado y la primera fila de datos
+FILAS_OMITIDAS = 2
+DEUDAS_CACHE_TTL = float(os.environ.get("DEUDAS_CACHE_TTL", "3600"))
+DEUDAS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_NS_RELACIONES = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PAQUETE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+class FormatoNoSoportado(Exception):
+    """El .xlsx no se puede leer con el lector rápido; se usa pandas."""
+
+
+class _TextoCompartido:
+    """Celda de texto compartido: índice en xl/sharedStrings.xml, que se lee solo si hace falta el texto."""
+
+    __slots__ = ("indice",)
+
+    def __init__(self, indice):
+        self.indice = indice
+
+
+def _letra_columna(indice):
+    letras = ""
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(ord("A") + resto) + letras
+    return letras
+
+
+def _ruta_primera_hoja(archivo_zip):
+    # xl/workbook.xml lista las hojas en orden; su r:id apunta al XML de la hoja
+    with archivo_zip.open("xl/workbook.xml") as workbook:
+        for _, elemento in iterparse(workbook):
+            if elemento.tag.endswith("}sheet"):
+                id_relacion = elemento.get(f"{_NS_RELACIONES}id")
+                break
+        else:
+            raise FormatoNoSoportado("El libro no tiene hojas")
+    with archivo_zip.open("xl/_rels/workbook.xml.rels") as relaciones:
+        for _, elemento in iterparse(relaciones):
+            if elemento.tag == f"{_NS_PAQUETE}Relationship" and elemento.get("Id") == id_relacion:
+                destino = elemento.get("Target")
+                if destino.startswith("/"):
+                    return destino.lstrip("/")
+                return posixpath.normpath(posixpath.join("xl", destino))
+    raise FormatoNoSoportado("No se encontró la hoja en las relaciones del libro")
+
+
+def _leer_columna_xlsx(file_path):
+    # Recorre el XML de la primera hoja con un parser incremental y solo
+    # convierte las celdas de la columna de deuda; las filas se liberan al terminar.
+    letra = _letra_columna(COLUMNA_DEUDA)
+    valores = []
+    fila_encabezado = None
+    titulo = None
+    with zipfile.ZipFile(file_path) as archivo_zip:
+        with archivo_zip.open(_ruta_primera_hoja(archivo_zip)) as hoja:
+            eventos = iterparse(hoja, events=("start", "end"))
+            _, raiz = next(eventos)
+            ns = raiz.tag[:raiz.tag.index("}") + 1] if raiz.tag.startswith("{") else ""
+            tag_fila, tag_celda, tag_valor = f"{ns}row", f"{ns}c", f"{ns}v"
+            for evento, elemento in eventos:
+                if evento != "end":
+                    continue
+                if elemento.tag == tag_celda:
+                    referencia = elemento.get("r")
+                    if referencia is None:
+                        raise FormatoNoSoportado("Celdas sin referencia")
+                    if referencia.rstrip("0123456789") != letra:
+                        continue
+                    numero_fila = int(referencia[len(letra):])
+                    if fila_encabezado is None:
+                        fila_encabezado = numero_fila
+                    if numero_fila == fila_encabezado:
+                        titulo = _valor_celda(elemento, tag_valor)
+                    elif numero_fila >= fila_encabezado + FILAS_OMITIDAS:
+                        valores.append(_valor_celda(elemento, tag_valor))
+                elif elemento.tag == tag_fila:
+                    if fila_encabezado is None:
+                        fila_encabezado = int(elemento.get("r", 0)) or None
+                        if fila_encabezado is None:
+                            raise FormatoNoSoportado("Filas sin número")
+                    elemento.clear()
+        # Los textos compartidos solo importan en el encabezado y en los valores
+        # no numéricos (que son un error): se resuelven solo esos
+        pendientes = {valor.indice for valor in [titulo, *valores] if isinstance(valor, _TextoCompartido)}
+        if pendientes:
+            textos = _textos_compartidos(archivo_zip, pendientes)
+            if isinstance(titulo, _TextoCompartido):
+                titulo = textos[titulo.indice]
+            for posicion, valor in enumerate(valores):
+                if isinstance(valor, _TextoCompartido):
+                    valores[posicion] = textos[valor.indice]
+    if not _titulo_valido(titulo):
+        raise ValueError(f"El archivo {Path(file_path).name} no tiene encabezado en la columna de deuda")
+    return valores
+
+
+def _textos_compartidos(archivo_zip, indices):
+    # Recorre xl/sharedStrings.xml hasta el mayor índice pedido, sin guardar los demás textos
+    textos = {}
+    ultimo = max(indices)
+    with archivo_zip.open("xl/sharedStrings.xml") as compartidos:
+        indice = 0
+        for _, elemento in iterparse(compartidos):
+            if not elemento.tag.endswith("}si"):
+                continue
+            if indice in indices:
+                ns = elemento.tag[:-2]
+                # rPh es la guía fonética, que no forma parte del texto visible
+                for fonetica in elemento.findall(f"{ns}rPh"):
+                    elemento.remove(fonetica)
+                textos[indice] = "".join(texto.text or "" for texto in elemento.iter(f"{ns}t"))
+            elemento.clear()
+            if indice == ultimo:
+                break
+            indice += 1
+    faltantes = indices - textos.keys()
+    if faltantes:
+        raise FormatoNoSoportado(f"Textos compartidos inexistentes: {sorted(faltantes)}")
+    return textos
+
+
+def _valor_celda(celda, tag_valor):
+    if celda.get("t") == "inlineStr":
+        return "".join(celda.itertext()) or None
+    valor = celda.find(tag_valor)
+    if valor is None or valor.text is None:
+        return None
+    tipo = celda.get("t", "n")
+    if tipo == "n":
+        return float(valor.text)
+    if tipo == "s":
+        return _TextoCompartido(int(valor.text))
+    if tipo == "b":
+        return valor.text == "1"
+    return valor.text
+
+
+def _titulo_valido(titulo):
+    return titulo is not None and titulo == titulo and bool(str(titulo).strip())
+
+
+def _validar_encabezado(encabezado, file_path):
+    if encabezado is None or len(encabezado) <= COLUMNA_DEUDA:
+        raise ValueError(f"El archivo {Path(file_path).name} no tiene la columna de deuda")
+    if not _titulo_valido(encabezado[COLUMNA_DEUDA]):
+        raise ValueError(f"El archivo {Path(file_path).name} no tiene encabezado en la columna de deuda")
+
+
+def _validar_valores(valores):
+    numericos = []
+    for valor in valores:
+        if valor is None:
+            continue
+        if not isinstance(valor, (int, float)):
+            raise ValueError(f"Valor no numérico en la columna de deuda: {valor!r}")
+        numericos.append(valor)
+    return numericos
+
+
+def leer_columna_deuda(file_path):
+    """Devolver los valores de la columna de deuda, sin encabezado ni primera fila.
+
+    Los .xlsx se leen en streaming proyectando solo esa columna; otros
+    formatos usan pandas limitado a la misma columna.
+    """
+    if Path(file_path).suffix.lower() in (".xlsx", ".xlsm"):
+        try:
+            return _leer_columna_xlsx(file_path)
+        except (FormatoNoSoportado, KeyError):
+            pass
+
+    import pandas as pd
+
+    encabezado = pd.read_excel(file_path, header=None, nrows=1).iloc[0].tolist()
+    _validar_encabezado(encabezado, file_path)
+    data_frame = pd.read_excel(file_path, usecols=[COLUMNA_DEUDA])
+    return data_frame.iloc[FILAS_OMITIDAS - 1:, 0].dropna().tolist()
+
+
+@dataclass(frozen=True)
+class TablaDeudas:
+    """Deuda total y saldos por fila (float64) de un reporte del buró."""
+
+    deuda_financiera: float
+    saldos: np.ndarray
+
+    @property
+    def nbytes(self):
+        return self.saldos.nbytes
+
+
+def leer_deudas_excel(file_path):
+    """Leer la columna de deuda y devolver el total junto con los saldos por fila."""
+    saldos = _validar_valores(leer_columna_deuda(file_path))
+    return TablaDeudas(deuda_financiera=math.fsum(saldos), saldos=np.array(saldos, dtype=np.float64))
+
+
+def calcular_deuda_excel(file_path):
+    """Sumar la deuda financiera de un reporte Excel del buró."""
+    return leer_deudas_excel(file_path).deuda_financiera
+
+
+# Reportes ya procesados, por hash SHA-256 del contenido del archivo
+cache_deudas = CacheLRU(
+    max_bytes=DEUDAS_CACHE_MAX_BYTES,
+    ttl=DEUDAS_CACHE_TTL,
+    tamano=lambda tabla: tabla.nbytes + 128,
+)
@@ -0,0 +1,160 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from fastapi.responses import PlainTextResponse
+
+# Ruta del backend con las métricas en formato de texto de Prometheus
+RUTA_METRICAS = "/metrics"
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites de los histogramas de latencia, en segundos
+BUCKETS_EVENTO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_CALCULO = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3, 1e-2)
+
+_metricas = []
+_colectores = []
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ""
+    return "{" + ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)) + "}"
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Contador acumulativo; los valores de las etiquetas se pasan en el orden de `etiquetas`."""
+
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def inc(self, cantidad=1, *etiquetas):
+        with self._lock:
+            self._valores[etiquetas] = self._valores.get(etiquetas, 0) + cantidad
+
+    def muestras(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        return [(self.nombre, _etiquetas(self.etiquetas, clave), valor) for clave, valor in valores]
+
+
+class Histograma:
+    """Histograma de latencias con buckets fijos, exportado en formato Prometheus."""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_EVENTO):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        self._series = {}  # etiquetas -> [conteos por bucket (+Inf al final), suma]
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def observar(self, valor, *etiquetas):
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[etiquetas] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def medir(self, *etiquetas, operacion=None):
+        """Observar la duración del bloque, también si termina con excepción.
+
+        Con operacion, las excepciones que salen del bloque se cuentan en ERRORES.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if operacion is not None:
+                ERRORES.inc(1, operacion)
+            raise
+        finally:
+            self.observar(time.perf_counter() - inicio, *etiquetas)
+
+    def muestras(self):
+        with self._lock:
+            series = [(clave, list(conteos), suma) for clave, (conteos, suma) in self._series.items()]
+        muestras = []
+        for clave, conteos, suma in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                acumulado += conteo
+                etiquetas = _etiquetas(self.etiquetas + ("le",), clave + (_numero(limite),))
+                muestras.append((f"{self.nombre}_bucket", etiquetas, acumulado))
+            muestras.append((f"{self.nombre}_sum", _etiquetas(self.etiquetas, clave), suma))
+            muestras.append((f"{self.nombre}_count", _etiquetas(self.etiquetas, clave), acumulado))
+        return muestras
+
+
+def registrar_colector(funcion):
+    """Agregar una función que al exportar devuelve [(nombre, tipo, ayuda, etiquetas, {valores: valor})].
+
+    Sirve para valores que ya se llevan en otro lado, como las estadísticas de las caches.
+    """
+    _colectores.append(funcion)
+    return funcion
+
+
+def exportar():
+    """Todas las métricas en el formato de texto de Prometheus."""
+    lineas = []
+    for metrica in _metricas:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        for nombre, etiquetas, valor in metrica.muestras():
+            lineas.append(f"{nombre}{etiquetas} {_numero(valor)}")
+    for colector in _colectores:
+        for nombre, tipo, ayuda, etiquetas, valores in colector():
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            for clave, valor in valores.items():
+                lineas.append(f"{nombre}{_etiquetas(etiquetas, clave)} {_numero(valor)}")
+    return "\n".join(lineas) + "\n"
+
+
+async def metricas_endpoint():
+    """Entregar las métricas de este proceso para que Prometheus las recolecte."""
+    return PlainTextResponse(exportar(), media_type=TIPO_CONTENIDO)
+
+
+# Métricas de la aplicación
+SUBMIT_SEGUNDOS = Histograma("alvian_handle_submit_seconds", "Duración de handle_submit")
+CALIFICACION_SEGUNDOS = Histograma(
+    "alvian_calificacion_seconds", "Duración de calcular_calificacion_final", buckets=BUCKETS_CALCULO
+)
+SENSIBILIDAD_SEGUNDOS = Histograma("alvian_sensibilidad_seconds", "Duración de calcular_sensibilidad (grilla monto x plazo)")
+DASHBOARD_SEGUNDOS = Histograma("alvian_dashboard_seconds", "Lectura de los resúmenes del dashboard de cartera")
+UPLOAD_SEGUNDOS = Histograma("alvian_upload_seconds", "Duración de la subida del Excel por RUTA_SUBIDA, incluida su lectura")
+EXCEL_SEGUNDOS = Histograma(
+    "alvian_excel_seconds", "Duración de load_excel_data según el origen del resultado", ("origen",)
+)
+EXCEL_BYTES = Contador("alvian_excel_bytes_total", "Bytes de Excel leídos (sin contar aciertos de cache)")
+PDF_SEGUNDOS = Histograma(
+    "alvian_pdf_seconds", "Duración de generate_and_download_pdf según el origen del PDF", ("origen",)
+)
+PDFS_GENERADOS = Contador("alvian_pdfs_total", "Dictámenes entregados según el origen del PDF", ("origen",))
+ERRORES = Contador("alvian_errores_total", "Errores capturados por operación", ("operacion",))
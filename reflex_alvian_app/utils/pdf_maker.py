@@ -1,46 +1,91 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from io import BytesIO
-
-
-def generate_detailed_pdf(nombre, profesion, ingresos, fecha_nacimiento, empresa, perfil_comercial, producto, monto_solicitado, plazo, cuota, garantia, scoring, deuda_financiera, ratio_deuda_ingresos, puntaje, dictamen, comentarios):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
+import threading
+import zipfile
+
+
+SECTION_TITLES = (
+    "Datos del Solicitante:",
+    "Datos de la Operación:",
+    "Informe Financiero:",
+    "Calificación Final:",
+    "Comentarios:",
+)
+
+
+class PdfTemplate:
+    """Estilos y flowables fijos del dictamen, construidos una sola vez y reutilizados en cada render."""
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        # Copia del estilo Title para no modificar el de la hoja de estilos compartida
+        self.title_style = ParagraphStyle(name='DictamenTitle', parent=styles['Title'], alignment=1)
+        self.subtitle_style = ParagraphStyle(name='Subtitle', parent=styles['Heading2'], fontName='Helvetica-Bold', textColor=colors.white, backColor=colors.darkblue)
+        self.normal_style = styles['Normal']
+        self.header_table_style = TableStyle([('BACKGROUND', (0, 0), (-1, -1), colors.darkblue)])
+        self.value_table_style = TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        self.title = Paragraph("Dictamen de Crédito", self.title_style)
+        self.section_headers = {
+            section: Table([[Paragraph(f"<font color='white'>{section}</font>", self.subtitle_style)]], style=self.header_table_style)
+            for section in SECTION_TITLES
+        }
+        self.large_spacer = Spacer(1, 0.2 * inch)
+        self.small_spacer = Spacer(1, 0.1 * inch)
+
+    def section(self, story, title):
+        story.append(self.section_headers[title])
+        story.append(self.small_spacer)
+
+    def value_table(self, data):
+        table = Table(data)
+        table.setStyle(self.value_table_style)
+        return table
+
+
+_local = threading.local()
+
+
+def get_pdf_template():
+    """Plantilla del dictamen; una instancia por hilo porque los flowables guardan estado de layout."""
+    template = getattr(_local, "template", None)
+    if template is None:
+        template = _local.template = PdfTemplate()
+    return template
+
+
+def precargar():
+    """Preparar la plantilla en este proceso, para que el primer dictamen no pague el arranque."""
+    get_pdf_template()
+
+
+def dictamen_story(nombre, profesion, ingresos, fecha_nacimiento, empresa, perfil_comercial, producto, monto_solicitado, plazo, cuota, garantia, scoring, deuda_financiera, ratio_deuda_ingresos, puntaje, dictamen, comentarios):
+    """Flowables de un dictamen, para armar un documento solo o uno con varios dictámenes."""
+    template = get_pdf_template()
+    normal_style = template.normal_style
     story = []
 
     # Title
-    title_style = styles['Title']
-    title_style.alignment = 1  # Center alignment
-    story.append(Paragraph("Dictamen de Crédito", title_style))
-    story.append(Spacer(1, 0.2 * inch))
-
-    # Custom subtitle style
-    subtitle_style = ParagraphStyle(name='Subtitle', parent=styles['Heading2'], fontName='Helvetica-Bold', textColor=colors.white, backColor=colors.darkblue)
+    story.append(template.title)
+    story.append(template.large_spacer)
 
     # Datos del solicitante
-    story.append(Table([[Paragraph("<font color='white'>Datos del Solicitante:</font>", subtitle_style)]], style=[('BACKGROUND', (0, 0), (-1, -1), colors.darkblue)]))
-    story.append(Spacer(1, 0.1 * inch))
-
-    normal_style = styles['Normal']
+    template.section(story, "Datos del Solicitante:")
     data = [
         [Paragraph(f"<b>Nombre:</b> {nombre}", normal_style), Paragraph(f"<b>Fecha de Nacimiento:</b> {fecha_nacimiento}", normal_style)],
         [Paragraph(f"<b>Profesión:</b> {profesion}", normal_style), Paragraph(f"<b>Empresa:</b> {empresa}", normal_style)],
         [Paragraph(f"<b>Ingresos:</b> Gs. {format(ingresos, ',').replace(',', '.')}", normal_style), Paragraph(f"<b>Perfil Comercial:</b> {perfil_comercial}", normal_style)]
     ]
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    story.append(table)
-    story.append(Spacer(1, 0.2 * inch))
+    story.append(template.value_table(data))
+    story.append(template.large_spacer)
 
     # Datos de la Operación
-    story.append(Table([[Paragraph("<font color='white'>Datos de la Operación:</font>", subtitle_style)]], style=[('BACKGROUND', (0, 0), (-1, -1), colors.darkblue)]))
-    story.append(Spacer(1, 0.1 * inch))
+    template.section(story, "Datos de la Operación:")
     data_operacion = [
         [Paragraph(f"<b>Producto:</b> {producto}", normal_style)],
         [Paragraph(f"<b>Monto solicitado:</b> Gs. {format(monto_solicitado, ',').replace(',', '.')}", normal_style)],
@@ -48,52 +93,119 @@ def generate_detailed_pdf(nombre, profesion, ingresos, fecha_nacimiento, empresa
         [Paragraph(f"<b>Cuota:</b> Gs. {format(cuota, ',').replace(',', '.')}", normal_style)],
         [Paragraph(f"<b>Garantía:</b> {garantia}", normal_style)]
     ]
-    table_operacion = Table(data_operacion)
-    table_operacion.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    story.append(table_operacion)
-    story.append(Spacer(1, 0.2 * inch))
+    story.append(template.value_table(data_operacion))
+    story.append(template.large_spacer)
 
     # Informe financiero
-    story.append(Table([[Paragraph("<font color='white'>Informe Financiero:</font>", subtitle_style)]], style=[('BACKGROUND', (0, 0), (-1, -1), colors.darkblue)]))
-    story.append(Spacer(1, 0.1 * inch))
+    template.section(story, "Informe Financiero:")
     data_financiero = [
         [Paragraph(f"<b>Scoring:</b> {scoring}", normal_style)],
         [Paragraph(f"<b>Deuda financiera:</b> Gs. {format(deuda_financiera, ',').replace(',', '.')}", normal_style)],
         [Paragraph(f"<b>Ratio deuda/ingresos:</b> {ratio_deuda_ingresos}", normal_style)]
     ]
-    table_financiero = Table(data_financiero)
-    table_financiero.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    story.append(table_financiero)
-    story.append(Spacer(1, 0.2 * inch))
+    story.append(template.value_table(data_financiero))
+    story.append(template.large_spacer)
 
     # Calificación final
-    story.append(Table([[Paragraph("<font color='white'>Calificación Final:</font>", subtitle_style)]], style=[('BACKGROUND', (0, 0), (-1, -1), colors.darkblue)]))
-    story.append(Spacer(1, 0.1 * inch))
+    template.section(story, "Calificación Final:")
     data_calificacion = [
         [Paragraph(f"<b>Puntaje:</b> {puntaje}", normal_style)],
         [Paragraph(f"<b>Dictamen:</b> {dictamen}", normal_style)]
     ]
-    table_calificacion = Table(data_calificacion)
-    table_calificacion.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    story.append(table_calificacion)
-    story.append(Spacer(1, 0.2 * inch))
+    story.append(template.value_table(data_calificacion))
+    story.append(template.large_spacer)
 
     # Comentarios
-    story.append(Table([[Paragraph("<font color='white'>Comentarios:</font>", subtitle_style)]], style=[('BACKGROUND', (0, 0), (-1, -1), colors.darkblue)]))
-    story.append(Spacer(1, 0.1 * inch))
+    template.section(story, "Comentarios:")
     story.append(Paragraph(comentarios, normal_style))
+    return story
+
 
-    doc.build(story)
+def generate_detailed_pdf(nombre, profesion, ingresos, fecha_nacimiento, empresa, perfil_comercial, producto, monto_solicitado, plazo, cuota, garantia, scoring, deuda_financiera, ratio_deuda_ingresos, puntaje, dictamen, comentarios):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    doc.build(dictamen_story(nombre, profesion, ingresos, fecha_nacimiento, empresa, perfil_comercial, producto, monto_solicitado, plazo, cuota, garantia, scoring, deuda_financiera, ratio_deuda_ingresos, puntaje, dictamen, comentarios))
     buffer.seek(0)
     return buffer
 
 
+def generate_detailed_pdf_bytes(**kwargs):
+    """Igual que generate_detailed_pdf pero devuelve bytes, para ejecutarse en otro proceso."""
+    return generate_detailed_pdf(**kwargs).getvalue()
+
+
+class _Marcador(Flowable):
+    """Entrada del índice (outline) del PDF que apunta a la página donde empieza un dictamen."""
+
+    def __init__(self, titulo, clave):
+        super().__init__()
+        self.titulo = titulo
+        self.clave = clave
+
+    def wrap(self, available_width, available_height):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.clave)
+        self.canv.addOutlineEntry(self.titulo, self.clave, level=0)
+
+
+class _HistoriaPerezosa(list):
+    """Story que se completa con el dictamen siguiente recién cuando se terminó de maquetar el anterior.
+
+    SimpleDocTemplate.build consume la lista desde el principio y consulta
+    len() antes de cada flowable, así en memoria hay un solo dictamen a la vez.
+    """
+
+    def __init__(self, partes):
+        super().__init__()
+        self._partes = iter(partes)
+
+    def __len__(self):
+        if not list.__len__(self):
+            self.extend(next(self._partes, ()))
+        return list.__len__(self)
+
+
+def generate_batch_pdf(dictamenes, destino):
+    """Un solo PDF con un dictamen por sección, cada uno desde una página nueva y con entrada en el índice.
+
+    dictamenes es un iterable de pares (archivo, campos de generate_detailed_pdf)
+    y se recorre a medida que se maqueta; destino es una ruta o un archivo
+    abierto. Devuelve la cantidad de dictámenes.
+    """
+    cantidad = 0
+
+    def partes():
+        nonlocal cantidad
+        for archivo, campos in dictamenes:
+            story = [] if cantidad == 0 else [PageBreak()]
+            story.append(_Marcador(str(campos.get("nombre") or archivo), f"dictamen_{cantidad}"))
+            story.extend(dictamen_story(**campos))
+            cantidad += 1
+            yield story
+
+    doc = SimpleDocTemplate(destino, pagesize=A4, title="Dictámenes de Crédito")
+    doc.build(_HistoriaPerezosa(partes()))
+    return cantidad
+
+
+def generate_batch_zip(dictamenes, destino):
+    """Un ZIP con un PDF por dictamen, escrito a medida que se genera cada uno.
+
+    dictamenes es un iterable de pares (archivo, campos de generate_detailed_pdf);
+    destino es una ruta o un archivo abierto, que puede no admitir seek (por
+    ejemplo la salida estándar). Devuelve la cantidad de dictámenes.
+    """
+    cantidad = 0
+    # Los PDF ya salen comprimidos de ReportLab: se guardan sin volver a comprimir
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_STORED) as archivo_zip:
+        for archivo, campos in dictamenes:
+            archivo_zip.writestr(archivo, generate_detailed_pdf(**campos).getvalue())
+            cantidad += 1
+    return cantidad
+
+
 if __name__ == "__main__":
     # Example data
     nombre = "John Doe"
@@ -0,0 +1,130 @@
+import cProfile
+import datetime
+import functools
+import inspect
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+# Perfilado opcional de eventos lentos; desactivado mientras PERFILADO_UMBRAL_MS no esté definido
+UMBRAL_MS = float(os.environ.get("PERFILADO_UMBRAL_MS", "0"))
+PERFILADO_DIR = Path(os.environ.get("PERFILADO_DIR", ".perfiles"))
+MUESTREO = float(os.environ.get("PERFILADO_MUESTREO", "1.0"))  # fracción de eventos perfilados
+INTERVALO = float(os.environ.get("PERFILADO_INTERVALO", "60"))  # segundos mínimos entre perfiles guardados
+MAX_ARCHIVOS = int(os.environ.get("PERFILADO_MAX_ARCHIVOS", "50"))
+
+
+class Perfilador:
+    """Perfila eventos con cProfile y guarda en .pstats los que superan umbral_ms.
+
+    Solo hay un perfil activo a la vez (cProfile es uno por hilo y todos los
+    eventos comparten el hilo del event loop), se perfila una fracción
+    `muestreo` de los eventos y después de guardar un perfil no se vuelve a
+    perfilar hasta pasados `intervalo` segundos. Como el perfil sigue activo
+    mientras el evento espera, incluye también lo que el event loop ejecutó
+    en ese tiempo: justamente lo que hace falta para ver por qué un evento tardó.
+    """
+
+    def __init__(self, umbral_ms=UMBRAL_MS, directorio=PERFILADO_DIR, muestreo=MUESTREO,
+                 intervalo=INTERVALO, max_archivos=MAX_ARCHIVOS):
+        self.umbral = umbral_ms / 1000
+        self.directorio = Path(directorio)
+        self.muestreo = muestreo
+        self.intervalo = intervalo
+        self.max_archivos = max_archivos
+        self._activo = False
+        self._ultimo_guardado = -float("inf")
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Devolver un perfil ya activado, o None si este evento no se perfila."""
+        with self._lock:
+            if (
+                self._activo
+                or time.monotonic() - self._ultimo_guardado < self.intervalo
+                or random.random() >= self.muestreo
+            ):
+                return None
+            self._activo = True
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Otro profiler ya está activo en el proceso
+            with self._lock:
+                self._activo = False
+            return None
+        return perfil
+
+    def terminar(self, perfil, nombre, duracion):
+        """Detener el perfil y guardarlo si el evento superó el umbral."""
+        if perfil is None:
+            return None
+        perfil.disable()
+        try:
+            with self._lock:
+                if duracion < self.umbral or time.monotonic() - self._ultimo_guardado < self.intervalo:
+                    return None
+                self._ultimo_guardado = time.monotonic()
+            return self._guardar(perfil, nombre, duracion)
+        finally:
+            with self._lock:
+                self._activo = False
+
+    def _guardar(self, perfil, nombre, duracion):
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        marca = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        ruta = self.directorio / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', nombre)}_{marca}_{duracion * 1000:.0f}ms.pstats"
+        perfil.dump_stats(ruta)
+        print(f"Evento lento {nombre}: {duracion * 1000:.0f} ms, perfil en {ruta}")
+        archivos = sorted(self.directorio.glob("*.pstats"), key=lambda archivo: archivo.stat().st_mtime)
+        for viejo in archivos[:-self.max_archivos]:
+            viejo.unlink(missing_ok=True)
+        return ruta
+
+
+perfilador = Perfilador()
+
+
+def perfilado(fn):
+    """Perfilar el event handler fn con `perfilador` (sin efecto si UMBRAL_MS es 0).
+
+    Va debajo de @rx.event. Conserva el tipo de función (normal, corrutina o
+    generador asíncrono) y la firma, que Reflex usa para despachar el evento.
+    """
+    if perfilador.umbral <= 0:
+        return fn
+    nombre = fn.__qualname__
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            perfil = perfilador.iniciar()
+            try:
+                async for valor in fn(*args, **kwargs):
+                    yield valor
+            finally:
+                perfilador.terminar(perfil, nombre, time.perf_counter() - inicio)
+    elif inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            perfil = perfilador.iniciar()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                perfilador.terminar(perfil, nombre, time.perf_counter() - inicio)
+    else:
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            perfil = perfilador.iniciar()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                perfilador.terminar(perfil, nombre, time.perf_counter() - inicio)
+    return envoltura
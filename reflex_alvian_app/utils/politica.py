@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from .reglas import compilar_reglas
+
+# Archivo de política de calificación; se puede reemplazar con la variable de entorno
+RUTA_POLITICA = Path(
+    os.environ.get("POLITICA_CREDITO", Path(__file__).with_name("politica_credito.json"))
+)
+INTERVALO_OBSERVACION = 2.0  # segundos entre revisiones del archivo
+MAX_VERSIONES_COMPILADAS = 8
+
+_reglas_vigentes = None
+_firma_archivo = None
+_compiladas = {}  # (version, hash del contenido) -> ReglasPuntaje
+_lock_recarga = threading.Lock()
+
+
+def leer_politica(ruta=RUTA_POLITICA):
+    """Leer la política desde JSON o YAML (YAML requiere PyYAML)."""
+    ruta = Path(ruta)
+    contenido = ruta.read_bytes()
+    if ruta.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("Se requiere PyYAML para leer políticas en formato YAML") from e
+        politica = yaml.safe_load(contenido)
+    else:
+        politica = json.loads(contenido)
+    if "version" not in politica:
+        raise ValueError(f"La política {ruta} no tiene el campo 'version'")
+    return politica, hashlib.sha256(contenido).hexdigest()
+
+
+def _compilar_cacheado(politica, huella):
+    clave = (str(politica["version"]), huella)
+    reglas = _compiladas.get(clave)
+    if reglas is None:
+        reglas = compilar_reglas(politica, huella)
+        _compiladas[clave] = reglas
+        while len(_compiladas) > MAX_VERSIONES_COMPILADAS:
+            _compiladas.pop(next(iter(_compiladas)))
+    return reglas
+
+
+def _firma(ruta):
+    estado = os.stat(ruta)
+    return estado.st_mtime_ns, estado.st_size
+
+
+def recargar_politica(ruta=RUTA_POLITICA, forzar=False):
+    """Recompilar la política si el archivo cambió y reemplazar las reglas vigentes.
+
+    El reemplazo es una sola asignación: las evaluaciones en curso terminan con
+    las reglas que ya obtuvieron. Si el archivo nuevo es inválido se conservan
+    las reglas anteriores.
+    """
+    global _reglas_vigentes, _firma_archivo
+    with _lock_recarga:
+        firma = _firma(ruta)
+        if not forzar and firma == _firma_archivo:
+            return False
+        try:
+            politica, huella = leer_politica(ruta)
+            reglas = _compilar_cacheado(politica, huella)
+        except Exception as e:
+            if _reglas_vigentes is None:
+                raise
+            print(f"Error al recargar la política {ruta}: {str(e)}")
+            _firma_archivo = firma
+            return False
+        cambio = reglas is not _reglas_vigentes
+        _reglas_vigentes = reglas
+        _firma_archivo = firma
+        if cambio:
+            print(f"Política de calificación versión {reglas.version} cargada")
+        return cambio
+
+
+def obtener_reglas():
+    """Reglas vigentes; obtenerlas una vez por evaluación para usar una versión consistente."""
+    return _reglas_vigentes
+
+
+async def observar_politica(intervalo=INTERVALO_OBSERVACION):
+    """Tarea de fondo que recarga la política cuando cambia el archivo."""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await asyncio.to_thread(recargar_politica)
+        except OSError as e:
+            print(f"No se pudo leer la política {RUTA_POLITICA}: {str(e)}")
+
+
+recargar_politica(forzar=True)
@@ -0,0 +1,235 @@
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+# Orden de los criterios en la suma ponderada (se respeta para obtener resultados idénticos)
+CRITERIOS = ("edad", "ingresos", "faja", "antiguedad", "activos", "dti")
+
+
+@dataclass(frozen=True)
+class Tramos:
+    """Tabla de tramos compilada: valores[i] aplica a cortes[i-1] <= x < cortes[i]."""
+
+    cortes: tuple
+    valores: tuple
+    cortes_np: np.ndarray
+    valores_np: np.ndarray
+
+    def valor(self, x):
+        return self.valores[bisect_right(self.cortes, x)]
+
+    def valores_lote(self, x):
+        return self.valores_np[np.searchsorted(self.cortes_np, x, side="right")]
+
+
+@dataclass(frozen=True)
+class TablaFaja:
+    """Puntaje por letra en O(1), con búsqueda por rangos para valores de varias letras."""
+
+    letras: MappingProxyType
+    desdes: tuple
+    hastas: tuple
+    puntajes: tuple
+
+    def valor(self, faja):
+        faja = faja.upper()
+        puntaje = self.letras.get(faja)
+        if puntaje is not None:
+            return puntaje
+        indice = bisect_right(self.desdes, faja) - 1
+        if indice >= 0 and faja <= self.hastas[indice]:
+            return self.puntajes[indice]
+        return 0
+
+
+@dataclass(frozen=True)
+class TablaCategorias:
+    """Puntaje por categoría de texto; si minusculas es True se ignoran mayúsculas."""
+
+    tabla: MappingProxyType
+    minusculas: bool = False
+
+    def valor(self, categoria):
+        if self.minusculas:
+            categoria = categoria.lower()
+        return self.tabla.get(categoria, 0)
+
+
+def _limites(tramo):
+    # Convierte un tramo en el intervalo semiabierto [inferior, superior). Los
+    # límites se definen con "min"/"max" (inclusivos) o "min_excl"/"max_excl"
+    # (exclusivos); un límite ausente deja el tramo abierto hacia ese lado.
+    if "min" in tramo:
+        inferior = tramo["min"]
+    elif "min_excl" in tramo:
+        inferior = math.nextafter(tramo["min_excl"], math.inf)
+    else:
+        inferior = -math.inf
+    if "max" in tramo:
+        superior = math.nextafter(tramo["max"], math.inf)
+    elif "max_excl" in tramo:
+        superior = tramo["max_excl"]
+    else:
+        superior = math.inf
+    return inferior, superior
+
+
+def compilar_tramos(tramos, clave="puntaje", defecto=0):
+    limites = sorted((*_limites(tramo), tramo[clave]) for tramo in tramos)
+    cortes = []
+    valores = []
+    posicion = -math.inf
+    for inferior, superior, valor in limites:
+        if inferior < posicion or inferior >= superior:
+            raise ValueError(f"Tramo inválido o superpuesto: {inferior} - {superior}")
+        if inferior > posicion:
+            cortes.append(inferior)
+            valores.append(defecto)
+        valores.append(valor)
+        if superior != math.inf:
+            cortes.append(superior)
+        posicion = superior
+    if posicion != math.inf:
+        valores.append(defecto)
+    return Tramos(
+        cortes=tuple(cortes),
+        valores=tuple(valores),
+        cortes_np=np.array(cortes, dtype=float),
+        valores_np=np.array(valores, dtype=object if isinstance(defecto, str) else None),
+    )
+
+
+def compilar_faja(rangos):
+    rangos = sorted((rango["desde"].upper(), rango["hasta"].upper(), rango["puntaje"]) for rango in rangos)
+    for anterior, siguiente in zip(rangos, rangos[1:]):
+        if siguiente[0] <= anterior[1]:
+            raise ValueError(f"Rangos de faja superpuestos: {anterior[:2]} y {siguiente[:2]}")
+    letras = {}
+    for desde, hasta, puntaje in rangos:
+        if len(desde) == 1 and len(hasta) == 1:
+            for codigo in range(ord(desde), ord(hasta) + 1):
+                letras[chr(codigo)] = puntaje
+    return TablaFaja(
+        letras=MappingProxyType(letras),
+        desdes=tuple(rango[0] for rango in rangos),
+        hastas=tuple(rango[1] for rango in rangos),
+        puntajes=tuple(rango[2] for rango in rangos),
+    )
+
+
+@dataclass(frozen=True)
+class ReglasPuntaje:
+    """Reglas de calificación compiladas; compartidas por el cálculo escalar y en lote."""
+
+    version: str
+    ponderaciones: tuple
+    edad: Tramos
+    ingresos: Tramos
+    faja: TablaFaja
+    antiguedad: TablaCategorias
+    activos: TablaCategorias
+    dti: Tramos
+    recomendacion: Tramos
+    huella: str = ""  # hash del contenido del archivo de política
+
+    def puntaje_edad(self, edad):
+        return self.edad.valor(int(edad))
+
+    def puntaje_ingresos(self, ingresos):
+        return self.ingresos.valor(int(ingresos))
+
+    def puntaje_faja(self, faja):
+        return self.faja.valor(faja)
+
+    def puntaje_antiguedad(self, antiguedad):
+        return self.antiguedad.valor(antiguedad)
+
+    def puntaje_activos(self, activos):
+        return self.activos.valor(activos)
+
+    def puntaje_dti(self, dti):
+        return self.dti.valor(dti)
+
+    def recomendar(self, puntaje_total):
+        return self.recomendacion.valor(puntaje_total)
+
+    def calificar(self, edad, ingresos, faja, antiguedad, activos, deudas, cuota):
+        peso_edad, peso_ingresos, peso_faja, peso_antiguedad, peso_activos, peso_dti = self.ponderaciones
+        # Misma secuencia de sumas que sum([...]) sobre los puntajes ponderados
+        puntaje_total = (
+            0
+            + self.edad.valor(int(edad)) * peso_edad
+            + self.ingresos.valor(int(ingresos)) * peso_ingresos
+            + self.faja.valor(faja) * peso_faja
+            + self.antiguedad.valor(antiguedad) * peso_antiguedad
+            + self.activos.valor(activos) * peso_activos
+            + self.dti.valor(calcular_dti(deudas, ingresos, cuota)) * peso_dti
+        )
+        return puntaje_total, self.recomendacion.valor(puntaje_total)
+
+    def calificar_lote(self, edad, ingresos, faja, antiguedad, activos, deudas, cuota):
+        edad = np.asarray(edad).astype(np.int64)
+        ingresos = np.asarray(ingresos).astype(np.int64)
+        deudas = np.asarray(deudas).astype(np.int64)
+        cuota = np.asarray(cuota).astype(np.int64)
+
+        divisor = np.where(ingresos == 0, 1, ingresos)
+        dti = np.where(ingresos == 0, 0.0, (deudas + cuota) / divisor * 100)
+
+        puntajes = (
+            self.edad.valores_lote(edad),
+            self.ingresos.valores_lote(ingresos),
+            _valores_por_categoria(faja, self.faja.valor),
+            _valores_por_categoria(antiguedad, self.antiguedad.valor),
+            _valores_por_categoria(activos, self.activos.valor),
+            self.dti.valores_lote(dti),
+        )
+        # Misma secuencia de sumas que la versión escalar para obtener resultados idénticos
+        puntaje_total = 0
+        for puntaje, peso in zip(puntajes, self.ponderaciones):
+            puntaje_total = puntaje_total + puntaje.astype(np.int64) * peso
+        return puntaje_total, self.recomendacion.valores_lote(puntaje_total)
+
+
+def _valores_por_categoria(valores, funcion):
+    # Las columnas de texto tienen pocos valores distintos: se evalúa cada valor
+    # único y se expande con el índice inverso.
+    valores = np.asarray(valores, dtype=object)
+    unicos, inverso = np.unique(valores.astype(str), return_inverse=True)
+    puntajes = np.array([funcion(valor) for valor in unicos], dtype=np.int64)
+    return puntajes[inverso.reshape(valores.shape)]
+
+
+def calcular_dti(deudas, ingresos, cuota):
+    ingresos = int(ingresos)
+    deudas = int(deudas)
+    cuota = int(cuota)
+    if ingresos == 0:
+        return 0
+    return ((deudas + cuota) / ingresos) * 100
+
+
+def compilar_reglas(politica, huella=""):
+    ponderaciones = politica["ponderaciones"]
+    return ReglasPuntaje(
+        version=str(politica.get("version", "")),
+        huella=huella,
+        ponderaciones=tuple(ponderaciones[criterio] for criterio in CRITERIOS),
+        edad=compilar_tramos(politica["edad"]),
+        ingresos=compilar_tramos(politica["ingresos"]),
+        faja=compilar_faja(politica["faja"]),
+        antiguedad=TablaCategorias(MappingProxyType(dict(politica["antiguedad"]))),
+        activos=TablaCategorias(
+            MappingProxyType({clave.lower(): valor for clave, valor in politica["activos"].items()}),
+            minusculas=True,
+        ),
+        dti=compilar_tramos(politica["dti"]),
+        recomendacion=compilar_tramos(
+            politica["recomendacion"],
+            clave="etiqueta",
+            defecto=politica.get("recomendacion_defecto", "No definido"),
+        ),
+    )
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .amortizacion import FRANCES, calcular_cuota
+from .calculos import calcular_calificacion_lote
+from .politica import obtener_reglas
+
+# Ejes por defecto de la grilla: fracciones del monto solicitado y plazos habituales en meses
+FACTORES_MONTO = (0.25, 0.5, 0.75, 1.0, 1.25, 1.5)
+PLAZOS = (6, 12, 18, 24, 36, 48, 60)
+REDONDEO_MONTO = 100_000
+
+
+@dataclass(frozen=True)
+class GrillaSensibilidad:
+    """Resultado de la grilla: una fila por monto y una columna por plazo."""
+
+    montos: np.ndarray
+    plazos: np.ndarray
+    cuota: np.ndarray
+    puntaje: np.ndarray
+    recomendacion: np.ndarray
+
+
+def ejes_sensibilidad(monto, plazo, factores=FACTORES_MONTO, plazos=PLAZOS):
+    """Montos alrededor del solicitado y plazos habituales, incluidos siempre los del formulario."""
+    montos = {float(monto)} if monto > 0 else set()
+    montos.update(
+        float(max(round(monto * factor / REDONDEO_MONTO) * REDONDEO_MONTO, REDONDEO_MONTO)) for factor in factores
+    )
+    plazos = set(plazos) | ({int(plazo)} if plazo > 0 else set())
+    return np.array(sorted(montos)), np.array(sorted(plazos))
+
+
+def calcular_grilla(edad, ingresos, faja, antiguedad, activos, deudas, montos, plazos, tasa, sistema=FRANCES):
+    """Calificar todas las combinaciones monto x plazo de un solicitante en una sola llamada en lote.
+
+    La cuota de cada celda se calcula con el sistema de amortización y se
+    redondea igual que en el formulario, así la celda del monto y plazo
+    solicitados coincide con la calificación de handle_submit.
+    """
+    montos = np.asarray(montos, dtype=np.float64)
+    plazos = np.asarray(plazos, dtype=np.int64)
+    monto, plazo = np.meshgrid(montos, plazos, indexing="ij")
+    cuota = np.round(calcular_cuota(monto, tasa, plazo, sistema))
+    puntaje, recomendacion = calcular_calificacion_lote(edad, ingresos, faja, antiguedad, activos, deudas, cuota)
+    return GrillaSensibilidad(
+        montos=montos,
+        plazos=plazos,
+        cuota=cuota,
+        puntaje=np.broadcast_to(puntaje, cuota.shape),
+        recomendacion=np.broadcast_to(recomendacion, cuota.shape),
+    )
+
+
+def color_puntaje(puntaje, reglas=None):
+    """Color de fondo de rojo a verde según el puntaje, entre el primer y el último corte de la recomendación."""
+    cortes = (reglas or obtener_reglas()).recomendacion.cortes_np
+    minimo, maximo = cortes[0], cortes[-1]
+    fraccion = np.clip((np.asarray(puntaje, dtype=np.float64) - minimo) / max(maximo - minimo, 1e-9), 0.0, 1.0)
+    return np.array([f"hsl({tono:.0f}, 70%, 82%)" for tono in (fraccion * 120).ravel()]).reshape(fraccion.shape)
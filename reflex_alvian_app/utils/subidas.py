@@ -0,0 +1,80 @@
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from pathlib import Path
+
+# Ruta del backend que recibe el Excel del buró como cuerpo del POST
+RUTA_SUBIDA = "/api/subir_excel"
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "20")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadDemasiadoGrande(ValueError):
+    """El archivo subido supera MAX_UPLOAD_BYTES."""
+
+
+def nombre_seguro(filename):
+    """Nombre de archivo sin componentes de ruta, para no escribir fuera del directorio de uploads."""
+    nombre = Path(filename or "").name
+    if nombre in ("", ".", ".."):
+        raise ValueError(f"Nombre de archivo inválido: {filename!r}")
+    return nombre
+
+
+def ruta_temporal(directorio, nombre):
+    """Ruta única en directorio para una subida, con la extensión del nombre original.
+
+    El nombre que manda el cliente solo se muestra: dos sesiones que suben
+    el mismo nombre a la vez no comparten archivo.
+    """
+    return Path(directorio) / f"subida_{uuid.uuid4().hex}{Path(nombre).suffix}"
+
+
+def parte_nombre_archivo(texto, defecto="Sin_nombre"):
+    """Texto apto para formar parte de un nombre de archivo: sin separadores de ruta, espacios ni "..".
+
+    Los caracteres que no son letras, dígitos, punto o guion pasan a "_";
+    se conservan las letras acentuadas.
+    """
+    parte = re.sub(r"[^\w.-]+", "_", str(texto or "")).strip("._-")
+    return parte or defecto
+
+
+async def guardar_bloques(bloques, destino, max_bytes=MAX_UPLOAD_BYTES, chunk_size=UPLOAD_CHUNK_SIZE, progreso=None):
+    """Escribir en destino los bloques de bytes de un iterable asíncrono (por ejemplo request.stream()).
+
+    Se acumulan hasta chunk_size bytes antes de cada escritura, que se hace en
+    un hilo para no bloquear el event loop; en memoria nunca hay más que eso.
+    Si se supera max_bytes o falla la lectura, se borra el archivo parcial y
+    se propaga la excepción (UploadDemasiadoGrande por tamaño). progreso es
+    una corrutina opcional que recibe los bytes escritos después de cada
+    escritura. Devuelve el hash SHA-256 del contenido.
+    """
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    escritos = 0
+    huella = hashlib.sha256()
+    pendiente = bytearray()
+    archivo = await asyncio.to_thread(open, destino, "wb")
+    try:
+        async for bloque in bloques:
+            escritos += len(bloque)
+            if escritos > max_bytes:
+                raise UploadDemasiadoGrande(f"El archivo supera el límite de {max_bytes // (1024 * 1024)} MB")
+            huella.update(bloque)
+            pendiente += bloque
+            if len(pendiente) >= chunk_size:
+                await asyncio.to_thread(archivo.write, bytes(pendiente))
+                pendiente.clear()
+                if progreso is not None:
+                    await progreso(escritos)
+        if pendiente:
+            await asyncio.to_thread(archivo.write, bytes(pendiente))
+    except BaseException:
+        await asyncio.to_thread(archivo.close)
+        destino.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(archivo.close)
+    return huella.hexdigest()
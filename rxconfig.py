@@ -1,7 +1,14 @@
+import os
+
 import reflex as rx
 
 config = rx.Config(
     app_name="reflex_alvian_app",
     frontend_path="",
     upload_directory="assets/upload",
-)
\ No newline at end of file
+    # Con REDIS_URL (redis://host:6379/0) el estado de cada sesión se guarda en
+    # Redis, por substate, y cualquier réplica del backend puede atenderla.
+    # Sin REDIS_URL queda en memoria/disco del proceso (una sola réplica).
+    redis_url=os.environ.get("REDIS_URL"),
+    redis_token_expiration=int(os.environ.get("REDIS_TOKEN_EXPIRATION", "3600")),
+)
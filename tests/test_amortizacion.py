@@ -0,0 +1,63 @@
+"""Cuotas y cronogramas vectorizados contra el cálculo mes a mes."""
+import numpy as np
+import pytest
+
+from reflex_alvian_app.utils.amortizacion import (
+    ALEMAN,
+    FRANCES,
+    calcular_cuota,
+    generar_cronograma,
+    generar_cronogramas,
+    sistema_valido,
+)
+
+PRESTAMOS = [
+    (10_000_000, 18, 12),
+    (50_000_000, 24.5, 60),
+    (1_000_000, 0, 6),
+    (7_500_000, 9, 1),
+    (123_456_789, 32, 48),
+]
+
+
+def cronograma_mes_a_mes(monto, tasa_anual, plazo, sistema):
+    """Cronograma recorriendo los meses, con la cuota francesa de la fórmula de la anualidad."""
+    tasa = tasa_anual / 1200
+    if sistema == FRANCES:
+        cuota_fija = monto / plazo if tasa == 0 else monto * tasa / (1 - (1 + tasa) ** -plazo)
+    saldo = monto
+    filas = []
+    for _ in range(plazo):
+        interes = saldo * tasa
+        amortizacion = cuota_fija - interes if sistema == FRANCES else monto / plazo
+        saldo -= amortizacion
+        filas.append((amortizacion + interes, interes, amortizacion, saldo))
+    return np.array(filas)
+
+
+@pytest.mark.parametrize("sistema", [FRANCES, ALEMAN])
+@pytest.mark.parametrize("monto,tasa,plazo", PRESTAMOS)
+def test_cronograma_igual_al_calculo_mes_a_mes(monto, tasa, plazo, sistema):
+    esperado = cronograma_mes_a_mes(monto, tasa, plazo, sistema)
+    cronograma = generar_cronograma(monto, tasa, plazo, sistema)
+    calculado = np.column_stack([cronograma.cuota, cronograma.interes, cronograma.amortizacion, cronograma.saldo])
+    np.testing.assert_allclose(calculado, esperado, rtol=1e-9, atol=1e-4)
+    assert calcular_cuota(monto, tasa, plazo, sistema) == pytest.approx(esperado[0, 0], rel=1e-12)
+
+
+def test_cronogramas_en_lote_con_plazos_distintos():
+    monto, tasa, plazo = (np.array(columna) for columna in zip(*PRESTAMOS))
+    sistema = np.array([FRANCES, ALEMAN] * 3)[: len(PRESTAMOS)]
+    cronogramas = generar_cronogramas(monto, tasa, plazo, sistema)
+    assert cronogramas.cuota.shape == (len(PRESTAMOS), plazo.max())
+    for i, prestamo in enumerate(PRESTAMOS):
+        esperado = cronograma_mes_a_mes(*prestamo, sistema[i])
+        np.testing.assert_allclose(cronogramas.cuota[i, : prestamo[2]], esperado[:, 0], rtol=1e-9)
+        assert not cronogramas.cuota[i, prestamo[2]:].any()
+
+
+def test_sistema_desconocido():
+    assert list(sistema_valido(["Francés", " aleman ", "americano", ""])) == [True, True, False, False]
+    with pytest.raises(ValueError):
+        calcular_cuota(1_000_000, 10, 12, "americano")
+    assert calcular_cuota(1_000_000, 10, 0, FRANCES) == 0
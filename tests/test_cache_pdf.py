@@ -0,0 +1,13 @@
+"""Claves de la cache de dictámenes."""
+from reflex_alvian_app.utils import cache_pdf
+from reflex_alvian_app.utils.cache_pdf import clave_pdf
+
+
+def test_clave_distingue_tipos():
+    assert clave_pdf({"ingresos": 15000000}) != clave_pdf({"ingresos": 15000000.0})
+
+
+def test_clave_cambia_con_la_plantilla(monkeypatch):
+    anterior = clave_pdf({"nombre": "Ana"})
+    monkeypatch.setattr(cache_pdf, "VERSION_PLANTILLA", "otra")
+    assert clave_pdf({"nombre": "Ana"}) != anterior
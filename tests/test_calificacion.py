@@ -0,0 +1,184 @@
+"""Las reglas compiladas desde politica_credito.json deben dar lo mismo que las funciones if/elif originales."""
+import json
+import random
+
+import numpy as np
+import pytest
+
+from reflex_alvian_app.utils.calculos import (
+    cache_calificaciones,
+    calcular_calificacion_final,
+    calcular_calificacion_lote,
+)
+from reflex_alvian_app.utils.politica import RUTA_POLITICA, recargar_politica
+
+
+# Funciones originales, copiadas tal cual como referencia
+def ref_puntaje_edad(edad):
+    edad = int(edad)
+    if 20 <= edad <= 25:
+        return 5
+    elif 26 <= edad <= 35:
+        return 10
+    elif 36 <= edad <= 50:
+        return 15
+    elif 51 <= edad <= 65:
+        return 20
+    else:
+        return 0
+
+
+def ref_puntaje_ingresos(ingresos):
+    ingresos = int(ingresos)
+    if ingresos < 3_000_000:
+        return 5
+    elif 3_000_000 <= ingresos < 5_000_000:
+        return 10
+    elif 5_000_000 <= ingresos <= 10_000_000:
+        return 15
+    else:
+        return 20
+
+
+def ref_puntaje_faja(faja):
+    faja_dict = {"M-N": 5, "I-L": 10, "E-H": 15, "A-D": 20}
+    faja = faja.upper()
+    for rango, puntaje in faja_dict.items():
+        inicio, fin = rango.split("-")
+        if inicio <= faja <= fin:
+            return puntaje
+    return 0
+
+
+def ref_puntaje_antiguedad(antiguedad):
+    puntajes = {"6 meses a un año": 5, "1 a 2 años": 10, "3 a 5 años": 15, "Más de 5 años": 20}
+    return puntajes.get(antiguedad, 0)
+
+
+def ref_puntaje_activos(activos):
+    activos_dict = {"ninguno": 5, "vehículo": 10, "inmueble": 15, "vehículo e inmueble": 20}
+    return activos_dict.get(activos.lower(), 0)
+
+
+def ref_dti(deudas, ingresos, cuota):
+    ingresos = int(ingresos)
+    deudas = int(deudas)
+    cuota = int(cuota)
+    if ingresos == 0:
+        return 0
+    return ((deudas + cuota) / ingresos) * 100
+
+
+def ref_puntaje_dti(dti):
+    if dti > 50:
+        return 5
+    elif 40 <= dti <= 49:
+        return 10
+    elif 20 <= dti <= 39:
+        return 15
+    elif dti < 20:
+        return 20
+    else:
+        return 0
+
+
+def ref_calificacion_final(edad, ingresos, faja, antiguedad, activos, deudas, cuota):
+    puntaje_total = sum([
+        ref_puntaje_edad(edad) * 0.10,
+        ref_puntaje_ingresos(ingresos) * 0.20,
+        ref_puntaje_faja(faja) * 0.20,
+        ref_puntaje_antiguedad(antiguedad) * 0.10,
+        ref_puntaje_activos(activos) * 0.20,
+        ref_puntaje_dti(ref_dti(deudas, ingresos, cuota)) * 0.20,
+    ])
+    if 5 <= puntaje_total < 10:
+        recomendacion = "No recomendado"
+    elif 10 <= puntaje_total < 16:
+        recomendacion = "Aprobado con condiciones"
+    elif 16 <= puntaje_total <= 20:
+        recomendacion = "Aprobado"
+    else:
+        recomendacion = "No definido"
+    return puntaje_total, recomendacion
+
+
+EDADES = [0, 19, 20, 25, 26, 35, 36, 50, 51, 65, 66, 90]
+INGRESOS = [0, 1, 2_999_999, 3_000_000, 4_999_999, 5_000_000, 10_000_000, 10_000_001, 25_000_000]
+FAJAS = ["A", "d", "E", "H", "I", "L", "M", "N", "O", "Z", "", "AB", "DZ", "MN", "NA", "e1"]
+ANTIGUEDADES = ["6 meses a un año", "1 a 2 años", "3 a 5 años", "Más de 5 años", "otra"]
+ACTIVOS = ["Ninguno", "No", "Vehículo", "INMUEBLE", "Vehículo e Inmueble", ""]
+# (deudas, cuota) con ingresos de 10_000_000: DTI en los huecos 39-40 y 49-50 y en los bordes
+DTI_CASOS = [
+    (0, 0), (1_900_000, 99_999), (2_000_000, 0), (3_900_000, 0), (3_900_000, 1),
+    (3_950_000, 0), (4_000_000, 0), (4_900_000, 0), (4_900_000, 1), (4_950_000, 0),
+    (5_000_000, 0), (5_000_000, 1), (9_000_000, 500_000),
+]
+
+
+def _perfiles_aleatorios(cantidad, semilla=11):
+    azar = random.Random(semilla)
+    return [
+        (
+            azar.choice(EDADES + [azar.randint(0, 90)]),
+            azar.choice(INGRESOS + [azar.randrange(0, 30_000_000, 1_000)]),
+            azar.choice(FAJAS),
+            azar.choice(ANTIGUEDADES),
+            azar.choice(ACTIVOS),
+            azar.randrange(0, 8_000_000, 1_000),
+            azar.randrange(0, 3_000_000, 1_000),
+        )
+        for _ in range(cantidad)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    cache_calificaciones.clear()
+    yield
+    cache_calificaciones.clear()
+
+
+@pytest.mark.parametrize("deudas,cuota", DTI_CASOS)
+@pytest.mark.parametrize("ingresos", [10_000_000, 10_000_001])
+def test_bordes_dti_e_ingresos(deudas, cuota, ingresos):
+    perfil = (40, ingresos, "A", "3 a 5 años", "Vehículo", deudas, cuota)
+    assert calcular_calificacion_final(*perfil) == ref_calificacion_final(*perfil)
+
+
+@pytest.mark.parametrize("faja", FAJAS)
+@pytest.mark.parametrize("edad", EDADES)
+def test_bordes_faja_y_edad(faja, edad):
+    perfil = (edad, 10_000_000, faja, "1 a 2 años", "Inmueble", 1_000_000, 500_000)
+    assert calcular_calificacion_final(*perfil) == ref_calificacion_final(*perfil)
+
+
+def test_calificacion_individual_aleatoria():
+    for perfil in _perfiles_aleatorios(5_000):
+        assert calcular_calificacion_final(*perfil) == ref_calificacion_final(*perfil), perfil
+
+
+def test_calificacion_lote_igual_a_referencia():
+    perfiles = _perfiles_aleatorios(20_000, semilla=23)
+    perfiles += [(40, ingresos, "AB", "3 a 5 años", "No", d, c) for ingresos in INGRESOS for d, c in DTI_CASOS]
+    puntajes, recomendaciones = calcular_calificacion_lote(*(np.array(columna) for columna in zip(*perfiles)))
+    for perfil, puntaje, recomendacion in zip(perfiles, puntajes, recomendaciones):
+        assert (puntaje, recomendacion) == ref_calificacion_final(*perfil), perfil
+
+
+def test_cache_no_reutiliza_politica_recargada_con_la_misma_version(tmp_path):
+    perfil = (40, 10_000_000, "A", "3 a 5 años", "Vehículo", 1_000_000, 500_000)
+    politica = json.loads(RUTA_POLITICA.read_text(encoding="utf-8"))
+    politica["ponderaciones"]["edad"] = 0.0
+    ruta = tmp_path / "politica.json"
+    ruta.write_text(json.dumps(politica), encoding="utf-8")
+    try:
+        original = calcular_calificacion_final(*perfil)
+        hits = cache_calificaciones.estadisticas()["hits"]
+        recargar_politica(ruta, forzar=True)
+        recalculado = calcular_calificacion_final(*perfil)
+        assert cache_calificaciones.estadisticas()["hits"] == hits
+        assert recalculado[0] == pytest.approx(original[0] - 1.5)
+        assert calcular_calificacion_final(*perfil) == recalculado
+        assert cache_calificaciones.estadisticas()["hits"] == hits + 1
+    finally:
+        recargar_politica(forzar=True)
@@ -0,0 +1,104 @@
+"""Evaluación masiva por bloques: escritura de resultados."""
+import pandas as pd
+import pytest
+
+from reflex_alvian_app.evaluacion_masiva import SIN_DATOS, evaluar_archivo
+
+
+def _solicitantes(cantidad):
+    return pd.DataFrame({
+        "nombre": [f"Solicitante {i}" for i in range(cantidad)],
+        "edad": 40,
+        "ingresos": 10_000_000,
+        "faja": "A",
+        "antiguedad": "3 a 5 años",
+        "activos": "Vehículo",
+        "deudas": 1_000_000,
+        "cuota": 500_000,
+    })
+
+
+def test_parquet_columna_vacia_en_el_primer_bloque(tmp_path):
+    pytest.importorskip("pyarrow")
+    entrada = tmp_path / "entrada.csv"
+    salida = tmp_path / "salida.parquet"
+    datos = _solicitantes(2_500)
+    datos["comentarios"] = [None] * 1_000 + ["ok"] * 1_500
+    datos.to_csv(entrada, index=False)
+
+    assert evaluar_archivo(entrada, salida, tamano_bloque=1_000, progreso=None) == 2_500
+
+    resultado = pd.read_parquet(salida)
+    assert resultado["comentarios"].isna().sum() == 1_000
+    assert (resultado["comentarios"].iloc[1_000:] == "ok").all()
+    assert resultado["puntaje_total"].notna().all()
+
+
+def test_parquet_numericas_con_primer_bloque_incompleto(tmp_path):
+    pytest.importorskip("pyarrow")
+    entrada = tmp_path / "entrada.csv"
+    salida = tmp_path / "salida.parquet"
+    datos = _solicitantes(2_500).drop(columns="cuota").assign(
+        monto_solicitado=20_000_000, plazo=24, tasa=[None] * 1_000 + [18] * 1_500, sistema="Francés",
+        comentarios=[None] * 1_000 + ["ok"] * 1_500,
+    )
+    datos.to_csv(entrada, index=False)
+
+    assert evaluar_archivo(entrada, salida, tamano_bloque=1_000, progreso=None) == 2_500
+
+    resultado = pd.read_parquet(salida)
+    for columna in ("tasa", "cuota", "puntaje_total", "monto_solicitado", "plazo", "ingresos"):
+        assert resultado[columna].dtype == "float64", columna
+    assert resultado["comentarios"].dtype == object
+    assert resultado[["tasa", "cuota", "puntaje_total"]].iloc[:1_000].isna().all().all()
+    assert (resultado["recomendacion"].iloc[:1_000] == SIN_DATOS).all()
+    assert resultado[["tasa", "cuota", "puntaje_total"]].iloc[1_000:].notna().all().all()
+    assert (resultado["tasa"].iloc[1_000:] == 18).all()
+
+
+def test_sistema_desconocido_marca_la_fila_incompleta(tmp_path):
+    entrada = tmp_path / "entrada.csv"
+    salida = tmp_path / "salida.csv"
+    datos = _solicitantes(4).drop(columns="cuota").assign(
+        monto_solicitado=20_000_000, plazo=24, tasa=18, sistema=["Francés", "americano", None, "ALEMAN"]
+    )
+    datos.to_csv(entrada, index=False)
+
+    assert evaluar_archivo(entrada, salida, progreso=None) == 4
+
+    resultado = pd.read_csv(salida)
+    assert list(resultado["recomendacion"] == SIN_DATOS) == [False, True, False, False]
+    assert resultado["cuota"].isna().tolist() == [False, True, False, False]
+
+
+NOMBRES_PELIGROSOS = ["Pérez/Gómez S.A.", "../../fuera", "..", "C:\\temp\\x"]
+
+
+def test_pdf_con_nombres_con_separadores(tmp_path):
+    entrada = tmp_path / "entrada.csv"
+    directorio = tmp_path / "dictamenes"
+    datos = _solicitantes(len(NOMBRES_PELIGROSOS))
+    datos["nombre"] = NOMBRES_PELIGROSOS
+    datos.to_csv(entrada, index=False)
+
+    evaluar_archivo(entrada, tmp_path / "salida.csv", progreso=None, directorio_pdf=directorio)
+
+    archivos = sorted(archivo.name for archivo in tmp_path.rglob("*.pdf"))
+    assert len(archivos) == len(NOMBRES_PELIGROSOS)
+    assert all((directorio / archivo).is_file() for archivo in archivos)
+    assert "dictamen_credito_Pérez_Gómez_S.A_0.pdf" in archivos
+
+
+def test_zip_con_nombres_con_separadores(tmp_path):
+    import zipfile
+
+    entrada = tmp_path / "entrada.csv"
+    datos = _solicitantes(len(NOMBRES_PELIGROSOS))
+    datos["nombre"] = NOMBRES_PELIGROSOS
+    datos.to_csv(entrada, index=False)
+
+    evaluar_archivo(entrada, tmp_path / "salida.csv", progreso=None, lote_pdf=tmp_path / "comite.zip")
+
+    nombres = zipfile.ZipFile(tmp_path / "comite.zip").namelist()
+    assert len(set(nombres)) == len(NOMBRES_PELIGROSOS)
+    assert not any("/" in nombre or "\\" in nombre or ".." in nombre for nombre in nombres)
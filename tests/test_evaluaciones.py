@@ -0,0 +1,39 @@
+"""Registro de evaluaciones: escritura en lote y resumen del dashboard."""
+import sqlite3
+import threading
+
+from reflex_alvian_app.utils import evaluaciones
+from reflex_alvian_app.utils.evaluaciones import RegistroEvaluaciones
+
+DATOS = {"producto": "Producto 1", "garantia": "ASF", "faja": "A", "ingresos": 10_000_000.0, "cuota": 500_000.0}
+
+
+def _evaluaciones_en_resumen(registro):
+    return sum(fila["evaluaciones"] for fila in registro.resumen("producto"))
+
+
+def test_resumen_de_base_anterior_se_completa_en_el_hilo_escritor(tmp_path, monkeypatch):
+    ruta = tmp_path / "evaluaciones.db"
+    anterior = RegistroEvaluaciones(ruta)
+    anterior.registrar("111", "Ana", 18.0, "Aprobado", DATOS)
+    anterior.cerrar()
+    # Base creada antes del resumen: historial con datos y resumen vacío
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("DELETE FROM resumen_evaluaciones")
+
+    hilos = []
+    reconstruir = evaluaciones.reconstruir_resumen
+
+    def reconstruir_registrando(conexion):
+        hilos.append(threading.current_thread().name)
+        reconstruir(conexion)
+
+    monkeypatch.setattr(evaluaciones, "reconstruir_resumen", reconstruir_registrando)
+    registro = RegistroEvaluaciones(ruta)
+    try:
+        registro.registrar("222", "Beto", 12.0, "Aprobado con condiciones", DATOS)
+        registro.esperar()
+        assert hilos == ["registro-evaluaciones"]
+        assert _evaluaciones_en_resumen(registro) == 2
+    finally:
+        registro.cerrar()
@@ -0,0 +1,209 @@
+"""Lector del Excel del buró: el lector XLSX en streaming contra el camino con pandas."""
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+from reflex_alvian_app.utils import excel_deudas
+from reflex_alvian_app.utils.excel_deudas import FormatoNoSoportado, leer_deudas_excel
+
+pytest.importorskip("openpyxl")
+
+ENCABEZADO = ["Entidad", "Tipo", "Operación", "Vencimiento", "Saldo"]
+FILAS = [
+    ["Banco 1", "Préstamo", 1, "2026-12-31", 1_000_000],  # primera fila de datos: no se suma
+    ["Banco 2", "Préstamo", 2, "2026-12-31", 2_500_000],
+    ["Banco 3", "Tarjeta", 3, "2026-12-31", 300_000.5],
+    ["Banco 4", "Tarjeta", 4, "2026-12-31", None],
+    ["Banco 5", "Préstamo", 5, "2026-12-31", 4_000_000],
+]
+ESPERADO = 2_500_000 + 300_000.5 + 4_000_000
+
+_TIPOS = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+{hojas}
+{compartidas}
+</Types>"""
+_RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+_LIBRO = """<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets>{hojas}</sheets>
+</workbook>"""
+_RELS_LIBRO = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{relaciones}
+</Relationships>"""
+_HOJA = """<?xml version="1.0" encoding="UTF-8"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>{filas}</sheetData></worksheet>"""
+_TIPO_HOJA = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+
+
+def _letra(indice):
+    return excel_deudas._letra_columna(indice)
+
+
+def _xml_filas(filas, textos, compartidos, referencias=True):
+    partes = []
+    for numero, fila in enumerate(filas, start=1):
+        if fila is None:  # fila ausente en el XML
+            continue
+        celdas = []
+        for columna, valor in enumerate(fila):
+            if valor is None:
+                continue
+            r = f' r="{_letra(columna)}{numero}"' if referencias else ""
+            if isinstance(valor, str):
+                if textos == "compartidos":
+                    compartidos.setdefault(valor, len(compartidos))
+                    celdas.append(f'<c{r} t="s"><v>{compartidos[valor]}</v></c>')
+                else:
+                    celdas.append(f'<c{r} t="inlineStr"><is><t>{escape(valor)}</t></is></c>')
+            else:
+                celdas.append(f"<c{r}><v>{valor}</v></c>")
+        partes.append(f'<row r="{numero}">{"".join(celdas)}</row>')
+    return "".join(partes)
+
+
+def crear_xlsx(ruta, filas, textos="compartidos", hojas_previas=0, destino="worksheets/hoja_datos.xml",
+               referencias=True):
+    """Libro mínimo escrito a mano: la hoja con datos es la primera del libro, con otro nombre de archivo."""
+    compartidos = {}
+    hojas = {destino.lstrip("/") if destino.startswith("/") else f"xl/{destino}": _HOJA.format(
+        filas=_xml_filas(filas, textos, compartidos, referencias)
+    )}
+    orden = [("rIdDatos", destino)]
+    for i in range(hojas_previas):
+        # Hojas que están en el zip pero después en el orden del libro
+        nombre = f"worksheets/sheet{i + 1}.xml"
+        hojas[f"xl/{nombre}"] = _HOJA.format(filas=_xml_filas([["x"] * 5, ["x"] * 5, ["x"] * 5], "inline", {}))
+        orden.append((f"rIdOtra{i}", nombre))
+    with zipfile.ZipFile(ruta, "w") as archivo_zip:
+        archivo_zip.writestr("[Content_Types].xml", _TIPOS.format(
+            hojas="".join(
+                f'<Override PartName="/{parte}" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for parte in hojas
+            ),
+            compartidas=(
+                '<Override PartName="/xl/sharedStrings.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            ) if compartidos else "",
+        ))
+        archivo_zip.writestr("_rels/.rels", _RELS)
+        archivo_zip.writestr("xl/workbook.xml", _LIBRO.format(hojas="".join(
+            f'<sheet name="Hoja{i + 1}" sheetId="{i + 1}" r:id="{id_relacion}"/>'
+            for i, (id_relacion, _) in enumerate(orden)
+        )))
+        relaciones = [
+            f'<Relationship Id="{id_relacion}" Type="{_TIPO_HOJA}" Target="{destino_hoja}"/>'
+            for id_relacion, destino_hoja in reversed(orden)
+        ]
+        if compartidos:
+            relaciones.append(
+                '<Relationship Id="rIdTextos" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                'relationships/sharedStrings" Target="sharedStrings.xml"/>'
+            )
+        archivo_zip.writestr("xl/_rels/workbook.xml.rels", _RELS_LIBRO.format(relaciones="".join(relaciones)))
+        for parte, contenido in hojas.items():
+            archivo_zip.writestr(parte, contenido)
+        if compartidos:
+            archivo_zip.writestr("xl/sharedStrings.xml", (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                + "".join(f"<si><t>{escape(texto)}</t></si>" for texto in compartidos)
+                + "</sst>"
+            ))
+    return ruta
+
+
+def _con_pandas(ruta, monkeypatch):
+    def sin_lector_rapido(file_path):
+        raise FormatoNoSoportado("forzar pandas")
+
+    with monkeypatch.context() as parche:
+        parche.setattr(excel_deudas, "_leer_columna_xlsx", sin_lector_rapido)
+        return leer_deudas_excel(ruta).deuda_financiera
+
+
+def _ambos(ruta, monkeypatch):
+    return leer_deudas_excel(ruta).deuda_financiera, _con_pandas(ruta, monkeypatch)
+
+
+@pytest.mark.parametrize("textos", ["compartidos", "inline"])
+def test_textos_compartidos_e_inline(tmp_path, monkeypatch, textos):
+    ruta = crear_xlsx(tmp_path / "buro.xlsx", [ENCABEZADO] + FILAS, textos=textos)
+    assert _ambos(ruta, monkeypatch) == (ESPERADO, ESPERADO)
+
+
+@pytest.mark.parametrize("destino", ["worksheets/hoja_datos.xml", "/xl/worksheets/hoja_datos.xml"])
+def test_primera_hoja_por_relacion_del_libro(tmp_path, monkeypatch, destino):
+    ruta = crear_xlsx(tmp_path / "buro.xlsx", [ENCABEZADO] + FILAS, hojas_previas=2, destino=destino)
+    assert _ambos(ruta, monkeypatch) == (ESPERADO, ESPERADO)
+
+
+def test_primera_fila_de_datos_en_blanco(tmp_path, monkeypatch):
+    filas = [ENCABEZADO, ["Banco 1", "Préstamo", 1, "2026-12-31", None]] + FILAS[1:]
+    ruta = crear_xlsx(tmp_path / "buro.xlsx", filas)
+    assert _ambos(ruta, monkeypatch) == (ESPERADO, ESPERADO)
+
+
+def test_celdas_dispersas(tmp_path, monkeypatch):
+    filas = [
+        ENCABEZADO,
+        [None, None, None, None, 1_000_000],
+        ["Banco 2", None, None, None, 2_500_000],
+        ["Banco 3"],
+        [None, None, None, None, 300_000.5, "extra"],
+        [None, None, None, None, 4_000_000],
+    ]
+    ruta = crear_xlsx(tmp_path / "buro.xlsx", filas)
+    assert _ambos(ruta, monkeypatch) == (ESPERADO, ESPERADO)
+
+
+def test_celdas_sin_referencia_usan_pandas(tmp_path, monkeypatch):
+    ruta = crear_xlsx(tmp_path / "buro.xlsx", [ENCABEZADO] + FILAS, referencias=False)
+    with pytest.raises(FormatoNoSoportado):
+        excel_deudas._leer_columna_xlsx(ruta)
+    assert _ambos(ruta, monkeypatch) == (ESPERADO, ESPERADO)
+
+
+@pytest.mark.parametrize("encabezado", [
+    ["Entidad", "Tipo", "Operación", "Vencimiento"],
+    ["Entidad", "Tipo", "Operación", "Vencimiento", ""],
+    ["Entidad", "Tipo", "Operación", "Vencimiento", "   "],
+])
+@pytest.mark.parametrize("textos", ["compartidos", "inline"])
+def test_sin_encabezado_de_deuda(tmp_path, monkeypatch, encabezado, textos):
+    ruta = crear_xlsx(tmp_path / "buro.xlsx", [encabezado] + FILAS, textos=textos)
+    with pytest.raises(ValueError, match="encabezado"):
+        leer_deudas_excel(ruta)
+    with pytest.raises(ValueError, match="encabezado|columna de deuda"):
+        _con_pandas(ruta, monkeypatch)
+
+
+@pytest.mark.parametrize("textos", ["compartidos", "inline"])
+def test_valor_no_numerico(tmp_path, monkeypatch, textos):
+    filas = [ENCABEZADO] + FILAS[:2] + [["Banco 3", "Tarjeta", 3, "2026-12-31", "sin dato"]] + FILAS[3:]
+    ruta = crear_xlsx(tmp_path / "buro.xlsx", filas, textos=textos)
+    with pytest.raises(ValueError, match="sin dato"):
+        leer_deudas_excel(ruta)
+    with pytest.raises(ValueError, match="sin dato"):
+        _con_pandas(ruta, monkeypatch)
+
+
+def test_libro_escrito_con_openpyxl(tmp_path, monkeypatch):
+    from openpyxl import Workbook
+
+    libro = Workbook()
+    hoja = libro.active
+    for fila in [ENCABEZADO] + FILAS:
+        hoja.append(fila)
+    ruta = tmp_path / "buro.xlsx"
+    libro.save(ruta)
+    assert _ambos(ruta, monkeypatch) == (ESPERADO, ESPERADO)
@@ -0,0 +1,107 @@
+"""Eventos del formulario, ejecutados sobre el estado sin servidor."""
+import asyncio
+import dataclasses
+
+import pytest
+
+from reflex.state import State
+
+from reflex_alvian_app.components import forms
+from reflex_alvian_app.components.forms import FormState, ResultadosState, SensibilidadState
+from reflex_alvian_app.utils import politica
+from reflex_alvian_app.utils.calculos import calcular_calificacion_final
+from reflex_alvian_app.utils.evaluaciones import RegistroEvaluaciones
+
+FORMULARIO = {
+    "nombre": "Juan Pérez",
+    "ci": "1234567",
+    "edad": "38",
+    "ingresos": "15000000",
+    "faja": "A",
+    "antiguedad_laboral": "3 a 5 años",
+    "posee_bienes": "Vehículo e Inmueble",
+    "monto_solicitado": "50000000",
+    "plazo": "36",
+    "tasa": "18",
+    "sistema": "Francés",
+}
+
+
+@pytest.fixture
+def registro(tmp_path, monkeypatch):
+    registro = RegistroEvaluaciones(tmp_path / "evaluaciones.db")
+    monkeypatch.setattr(forms, "registro_evaluaciones", registro)
+    yield registro
+    registro.cerrar()
+
+
+def _estados():
+    root = State(_reflex_internal_init=True)
+    return tuple(
+        root.get_substate(estado.get_full_name().split(".")[1:])
+        for estado in (FormState, ResultadosState, SensibilidadState)
+    )
+
+
+def _ejecutar(handler, estado, *args):
+    resultado = handler.fn(estado, *args)
+    if asyncio.iscoroutine(resultado):
+        asyncio.run(resultado)
+
+
+def test_aplicar_celda_recalifica_con_el_monto_y_plazo_nuevos(registro):
+    form, resultados, sensibilidad = _estados()
+    _ejecutar(FormState.handle_submit, form, {**FORMULARIO, "ingresos": "6000000", "monto_solicitado": "20000000"})
+    _ejecutar(SensibilidadState.calcular_sensibilidad, sensibilidad)
+    anterior = resultados.puntaje_final
+    celda = max(
+        (celda for fila in sensibilidad.filas for celda in fila["celdas"]),
+        key=lambda celda: abs(celda["puntaje"] - anterior),
+    )
+    assert celda["puntaje"] != anterior
+
+    _ejecutar(SensibilidadState.aplicar_celda, sensibilidad, celda["monto"], celda["plazo"])
+
+    assert (form.monto_solicitado, form.plazo) == (celda["monto"], celda["plazo"])
+    assert (resultados.puntaje_final, resultados.recomendacion) == (celda["puntaje"], celda["recomendacion"])
+    assert (resultados.puntaje_final, resultados.recomendacion) == calcular_calificacion_final(
+        form.edad, form.ingresos, form.faja, form.antiguedad_laboral, form.posee_bienes,
+        form.deuda_financiera, form.cuota,
+    )
+
+
+def test_tasa_cero_se_califica_y_en_blanco_no(registro):
+    form, resultados, _ = _estados()
+    _ejecutar(FormState.handle_submit, form, {**FORMULARIO, "tasa": ""})
+    assert not resultados.mostrar_resultados
+    assert form.aviso_cuota == forms.AVISO_TASA
+
+    _ejecutar(FormState.handle_submit, form, {**FORMULARIO, "tasa": "0"})
+    assert resultados.mostrar_resultados
+    assert form.aviso_cuota == ""
+    assert form.cuota == round(50_000_000 / 36)
+    assert (resultados.puntaje_final, resultados.recomendacion) == calcular_calificacion_final(
+        38, 15_000_000, "A", "3 a 5 años", "Vehículo e Inmueble", 0, form.cuota
+    )
+
+    _ejecutar(FormState.change_value, form, "", "tasa")
+    _ejecutar(FormState.handle_submit, form, {})
+    assert form.aviso_cuota == forms.AVISO_TASA
+
+
+def test_version_registrada_es_la_de_las_reglas_usadas(registro, monkeypatch):
+    form, _, _ = _estados()
+    vigentes = politica.obtener_reglas()
+    calificar = forms.calcular_calificacion_final
+
+    def calificar_y_recargar(*args, **kwargs):
+        resultado = calificar(*args, **kwargs)
+        # La política se recarga entre la calificación y el registro
+        monkeypatch.setattr(politica, "_reglas_vigentes", dataclasses.replace(vigentes, version="recargada"))
+        return resultado
+
+    monkeypatch.setattr(forms, "calcular_calificacion_final", calificar_y_recargar)
+    _ejecutar(FormState.handle_submit, form, FORMULARIO)
+    registro.esperar()
+
+    assert registro.ultima_evaluacion(FORMULARIO["ci"])["version_politica"] == vigentes.version
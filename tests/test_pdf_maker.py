@@ -0,0 +1,38 @@
+"""Dictamen individual: generate_detailed_pdf acepta argumentos posicionales y por nombre."""
+import inspect
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from reflex_alvian_app.utils.pdf_maker import dictamen_story, generate_detailed_pdf
+
+CAMPOS = dict(
+    nombre="Juan Pérez",
+    profesion="Asalariado",
+    ingresos=15_000_000,
+    fecha_nacimiento="1985-05-15",
+    empresa="Empresa S.A.",
+    perfil_comercial="Asalariado",
+    producto="Producto 1",
+    monto_solicitado=50_000_000,
+    plazo=36,
+    cuota=1_800_000,
+    garantia="Hipotecaria",
+    scoring="A",
+    deuda_financiera=2_000_000,
+    ratio_deuda_ingresos=25.3,
+    puntaje=18,
+    dictamen="Aprobado",
+    comentarios="Cliente con buen historial",
+)
+
+
+def test_firma_igual_a_dictamen_story():
+    assert list(inspect.signature(generate_detailed_pdf).parameters) == list(CAMPOS)
+    assert inspect.signature(generate_detailed_pdf) == inspect.signature(dictamen_story)
+
+
+def test_llamada_posicional_y_por_nombre():
+    assert generate_detailed_pdf(*CAMPOS.values()).getvalue().startswith(b"%PDF")
+    assert generate_detailed_pdf(**CAMPOS).getvalue().startswith(b"%PDF")
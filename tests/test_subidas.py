@@ -0,0 +1,25 @@
+"""Subidas del Excel: rutas temporales y escritura por bloques."""
+import asyncio
+
+import pytest
+
+from reflex_alvian_app.utils.subidas import UploadDemasiadoGrande, guardar_bloques, ruta_temporal
+
+
+async def _bloques(*partes):
+    for parte in partes:
+        yield parte
+
+
+def test_ruta_temporal_unica_con_la_extension_original(tmp_path):
+    rutas = {ruta_temporal(tmp_path, "reporte.xlsx") for _ in range(100)}
+    assert len(rutas) == 100
+    assert all(ruta.parent == tmp_path and ruta.suffix == ".xlsx" for ruta in rutas)
+    assert all(ruta.name != "reporte.xlsx" for ruta in rutas)
+
+
+def test_guardar_bloques_borra_el_parcial_si_supera_el_limite(tmp_path):
+    destino = ruta_temporal(tmp_path, "reporte.xlsx")
+    with pytest.raises(UploadDemasiadoGrande):
+        asyncio.run(guardar_bloques(_bloques(b"a" * 600, b"b" * 600), destino, max_bytes=1000, chunk_size=500))
+    assert not destino.exists()